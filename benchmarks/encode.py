@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Bulk update encoding: encode_updates vs one Update_.from_keyval per item
+
+Usage::
+
+    python benchmarks/encode.py [--items 100000]
+
+"""
+
+import argparse
+import decimal
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath("."))
+
+from gnmi.messages import Update_, encode_updates
+
+
+def _items(count):
+    leaves = [
+        ("mtu", 9000, "uint_val"),
+        ("description", "uplink", ""),
+        ("enabled", True, ""),
+        ("load-interval", decimal.Decimal("0.5"), ""),
+        ("tpid", b"\x81\x00", ""),
+        ("vlans", [10, 20, 30], ""),
+    ]
+    items = []
+    for i in range(count):
+        name, value, type_ = leaves[i % len(leaves)]
+        path = "/interfaces/interface[name=Ethernet%d]/config/%s" % (
+            i // len(leaves), name)
+        items.append((path, value, type_))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args()
+
+    items = _items(args.items)
+
+    start = time.perf_counter()
+    updates = [Update_.from_keyval(item).raw for item in items]
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    updates = encode_updates(items)
+    bulk = time.perf_counter() - start
+    assert len(updates) == args.items
+
+    print("%-16s %10s %14s" % ("method", "time", "items/s"))
+    print("%-16s %9.3fs %14.0f" % ("from_keyval", single, args.items / single))
+    print("%-16s %9.3fs %14.0f" % ("encode_updates", bulk, args.items / bulk))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Client decode cost of a Get response per encoding
+
+Every leaf is encoded the way a target answers with that encoding: scalar
+TypedValues for PROTO, JSON documents for JSON and JSON_IETF, text for ASCII.
+
+Usage::
+
+    python benchmarks/encoding.py [--leaves 20000]
+
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath("."))
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.messages import GetResponse_
+
+LEAVES = [
+    ("in-octets", 123456789012),
+    ("oper-status", "UP"),
+    ("enabled", True),
+    ("mtu", 9000),
+]
+
+
+def _value(encoding, value):
+    if encoding == "proto":
+        if isinstance(value, bool):
+            return pb.TypedValue(bool_val=value)
+        if isinstance(value, int):
+            return pb.TypedValue(uint_val=value)
+        return pb.TypedValue(string_val=value)
+    if encoding == "json_ietf":
+        # RFC 7951 encodes 64-bit integers as strings
+        if isinstance(value, int) and not isinstance(value, bool) and \
+                value > 2 ** 32:
+            value = str(value)
+        return pb.TypedValue(json_ietf_val=json.dumps(value).encode())
+    if encoding == "json":
+        return pb.TypedValue(json_val=json.dumps(value).encode())
+    return pb.TypedValue(ascii_val=str(value))
+
+
+def _response(encoding, count):
+    updates = []
+    for i in range(count):
+        name, value = LEAVES[i % len(LEAVES)]
+        path = pb.Path(elem=[pb.PathElem(name="state"),
+                             pb.PathElem(name=name)])
+        updates.append(pb.Update(path=path, val=_value(encoding, value)))
+    prefix = pb.Path(elem=[pb.PathElem(name="interfaces")])
+    return pb.GetResponse(notification=[
+        pb.Notification(prefix=prefix, update=updates)])
+
+
+def _best(func, repeat):
+    # best of `repeat` runs, without collector pauses
+    times = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leaves", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("%-10s %10s %10s %10s %12s" % ("encoding", "bytes", "parse",
+                                         "values", "us/leaf"))
+    for encoding in ["proto", "json_ietf", "json", "ascii"]:
+        data = _response(encoding, args.leaves).SerializeToString()
+        resp = GetResponse_(pb.GetResponse.FromString(data))
+
+        parse = _best(lambda: pb.GetResponse.FromString(data), args.repeat)
+        values = _best(lambda: [update.value for notif in resp
+                                for update in notif], args.repeat)
+
+        print("%-10s %10d %9.3fs %9.3fs %12.2f" % (
+            encoding, len(data), parse, values,
+            (parse + values) / args.leaves * 1e6))
+
+
+if __name__ == "__main__":
+    main()
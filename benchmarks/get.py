@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Get latency against a local server with an artificial per-path cost
+
+Usage::
+
+    python benchmarks/get.py [--paths 500] [--delay 0.002] [--polls 20]
+
+Also compares repeated Gets of the same paths with and without a prepared
+request, without the artificial cost.
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath("."))
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.session import Session
+from tests.server import Server, Servicer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", type=int, default=500)
+    parser.add_argument("--delay", type=float, default=0.002,
+                        help="server cost per path in seconds")
+    parser.add_argument("--shard-size", type=int, action="append",
+                        help="shard sizes to run (default: 250, 100, 50, 25)")
+    parser.add_argument("--polls", type=int, default=20)
+    args = parser.parse_args()
+
+    paths = ["/interfaces/interface[name=Ethernet%d]/state/oper-status" % i
+             for i in range(args.paths)]
+    servicer = Servicer(delay=args.delay)
+    for path in paths:
+        servicer.store[path] = pb.TypedValue(string_val="UP")
+
+    with Server(servicer) as server:
+        sess = Session(server.target)
+        print("%-12s %10s" % ("shard size", "latency"))
+        for shard_size in [None] + (args.shard_size or [250, 100, 50, 25]):
+            start = time.perf_counter()
+            resp = sess.get(paths, {"shard_size": shard_size})
+            elapsed = time.perf_counter() - start
+            assert len(resp.raw.notification) == args.paths
+            print("%-12s %9.3fs" % (shard_size or "-", elapsed))
+
+    servicer.delay = 0.0
+    with Server(servicer) as server:
+        sess = Session(server.target)
+        print()
+        print("%-12s %10s" % ("request", "per poll"))
+        for name, request in [
+                ("paths", paths),
+                ("prepared", sess.prepare_get(paths)),
+                ("serialized", sess.prepare_get(paths, serialize=True))]:
+            start = time.perf_counter()
+            for _ in range(args.polls):
+                sess.get(request)
+            elapsed = time.perf_counter() - start
+            print("%-12s %9.2fms" % (name, elapsed / args.polls * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Get response size and decode time with and without use_models against a
+local server holding both OpenConfig and native data
+
+Usage::
+
+    python benchmarks/models.py [--interfaces 1000] [--native 4]
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath("."))
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.session import Session
+from tests.server import Server, Servicer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interfaces", type=int, default=1000)
+    parser.add_argument("--native", type=int, default=4,
+                        help="native leaves per OpenConfig leaf")
+    args = parser.parse_args()
+
+    servicer = Servicer(models={"interfaces": "openconfig-interfaces",
+                                "Sysdb": "arista-sysdb"})
+    for i in range(args.interfaces):
+        servicer.store["/interfaces/interface[name=Ethernet%d]/state/mtu" %
+                       i] = pb.TypedValue(int_val=1500)
+        for j in range(args.native):
+            servicer.store["/Sysdb/interface/status/Ethernet%d/leaf%d" %
+                           (i, j)] = pb.TypedValue(int_val=j)
+
+    with Server(servicer) as server:
+        sess = Session(server.target)
+        print("%-24s %12s %10s %10s" % ("use_models", "bytes", "get",
+                                        "decode"))
+        for models in ([], ["openconfig-interfaces"]):
+            start = time.perf_counter()
+            resp = sess.get(["/"], {"use_models": models})
+            elapsed = time.perf_counter() - start
+
+            data = resp.raw.SerializeToString()
+            start = time.perf_counter()
+            decoded = pb.GetResponse.FromString(data)
+            values = [update.val.int_val for notif in decoded.notification
+                      for update in notif.update]
+            decode = time.perf_counter() - start
+            assert values
+
+            print("%-24s %12d %9.3fs %9.3fs" % (",".join(models) or "-",
+                                              len(data), elapsed, decode))
+
+
+if __name__ == "__main__":
+    main()
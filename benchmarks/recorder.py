@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+Recorder write and read throughput and compression ratio per block codec
+
+Usage::
+
+    python benchmarks/recorder.py [--count 200000] [--updates 10] [--json]
+
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath("."))
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.messages import Path_, SubscribeResponse_, Update_
+from gnmi.recorder import CODECS, Reader, Recorder, zstandard
+from gnmi.util import timestamp_ns
+
+
+def make_response(index, updates, json_=False):
+    prefix = Path_.from_string("/interfaces/interface[name=Ethernet%d]" % index)
+    upds = []
+    for i in range(updates):
+        path = "/state/counters/counter-%d" % i
+        value = index * i
+        if json_:
+            path = "/state/counters"
+            value = {"openconfig-interfaces:counter-%d" % i: str(index * i),
+                     "openconfig-interfaces:last-clear": "1588000000000000000"}
+        upds.append(Update_.from_keyval((path, value)).raw)
+    notif = pb.Notification(timestamp=timestamp_ns(), prefix=prefix.raw,
+                            update=upds)
+    return SubscribeResponse_(pb.SubscribeResponse(update=notif))
+
+
+def report(name, count, nbytes, elapsed):
+    print("%-8s %9d msgs in %6.3fs  %10.0f msgs/s  %8.1f MB/s" % (
+        name, count, elapsed, count / elapsed, nbytes / elapsed / 1e6))
+
+
+def run(args, responses, compression):
+    print("compression: %s" % compression)
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        raw = 0
+        with Recorder(directory, target="bench:6030", index=not args.no_index,
+                      compression=compression) as rec:
+            for i in range(args.count):
+                data = responses[i % len(responses)]
+                rec.write(data, timestamp=i)
+                raw += len(data)
+        elapsed = time.perf_counter() - start
+
+        reader = Reader(directory)
+        nbytes = sum(os.path.getsize(s) for s in reader.segments)
+        report("write", args.count, raw, elapsed)
+        print("%-8s %.2fx (%d -> %d bytes)" % ("ratio", raw / nbytes,
+                                               raw, nbytes))
+
+        start = time.perf_counter()
+        count = 0
+        for _ in reader:
+            count += 1
+        report("scan", count, raw, time.perf_counter() - start)
+
+        decode = min(args.count, 10000)
+        start = time.perf_counter()
+        for count, record in enumerate(reader, 1):
+            record.response
+            if count == decode:
+                break
+        report("decode", count, raw * count // args.count,
+               time.perf_counter() - start)
+
+        # one interface over the last tenth of the recording
+        start = time.perf_counter()
+        count = 0
+        for _ in reader.query("/interfaces/interface[name=Ethernet7]",
+                              start=args.count - args.count // 10):
+            count += 1
+        report("query", count, raw // 10, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=200000)
+    parser.add_argument("--updates", type=int, default=10,
+                        help="updates per notification")
+    parser.add_argument("--json", action="store_true",
+                        help="JSON-IETF container values instead of integers")
+    parser.add_argument("--no-index", action="store_true",
+                        help="record without the time and path index")
+    parser.add_argument("--compression", choices=["none"] + CODECS[1:],
+                        action="append", help="codecs to run (default: all)")
+    args = parser.parse_args()
+
+    # a small pool of distinct messages keeps generation out of the timing,
+    # responses arrive off the wire already serialized
+    responses = [make_response(i, args.updates, args.json).raw
+                 .SerializeToString() for i in range(64)]
+
+    codecs = args.compression or ["none", "zlib", "zstd"]
+    for compression in codecs:
+        if compression == "zstd" and zstandard is None:
+            print("compression: zstd (skipped, zstandard is not installed)")
+            continue
+        run(args, responses, None if compression == "none" else compression)
+
+
+if __name__ == "__main__":
+    main()
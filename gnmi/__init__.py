@@ -11,4 +11,5 @@ if sys.version_info < (3, 6):
     raise ValueError("Python 3.6+ is required")
 
 from gnmi.session import Session
-from gnmi.api import capabilites, delete, get, replace, subscribe, update
+from gnmi.api import capabilites, delete, get, replace, rollout, subscribe
+from gnmi.api import update
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.adaptive
+~~~~~~~~~~~~~~~~
+
+Sample subscriptions that slow down while the consumer lags behind
+
+"""
+
+import collections
+import queue
+import threading
+import time
+
+from typing import Iterator, List, Optional
+
+import grpc
+
+from gnmi.messages import Status_, SubscribeResponse_
+from gnmi.exceptions import GrpcError
+from gnmi.planner import split_entry
+from gnmi.structures import SubscribeOptions
+from gnmi.util import put_until
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_HIGH = 1000
+DEFAULT_LOW = 10
+DEFAULT_COOLDOWN = 5.0
+
+
+class IntervalChange(collections.namedtuple("IntervalChange", (
+        "time", "scale", "reason", "depth", "lag"))):
+    r"""A change of the sample intervals of an adaptive subscription
+
+    :param time: wall clock time of the change in seconds
+    :param scale: new multiplier of the configured intervals, 1.0 restores
+        them
+    :param reason: "lag" or "recovered"
+    :param depth: responses waiting for the consumer
+    :param lag: seconds between the newest consumed notification and now
+    """
+
+    __slots__ = ()
+
+
+class AdaptiveSubscription(object):
+    r"""Stream subscription that re-subscribes its SAMPLE paths with longer
+    intervals while the consumer falls behind
+
+    Responses are queued for the consumer.  When the queue holds `high`
+    responses, or a notification is older than `max_lag` seconds when
+    consumed, the sample intervals are multiplied by `factor`, up to
+    `max_interval`, and the sample paths are subscribed again.  Once the
+    queue is down to `low` responses and notifications are fresh again, the
+    configured intervals are restored.  Changes are at least `cooldown`
+    seconds apart and recorded in `events`.
+
+    Paths that are not sampled are kept on a stream of their own that is
+    never interrupted.
+
+    Usage::
+
+        In [1]: from gnmi.adaptive import AdaptiveSubscription
+        In [2]: sub = AdaptiveSubscription(sess, paths, {
+           ...:     "submode": "sample", "interval": 10 * 10**9},
+           ...:     max_interval=60 * 10**9)
+        In [3]: for resp in sub:
+           ...:     ...
+        In [4]: sub.events
+        Out[4]: [IntervalChange(time=..., scale=2.0, reason='lag', ...)]
+
+    :param session: session to the target
+    :type session: gnmi.session.Session
+    :param paths: paths or (path, SubscriptionOptions) tuples
+    :type paths: list
+    :param options: stream subscription options
+    :type options: gnmi.structures.SubscribeOptions
+    :param max_interval: upper bound of sample intervals in nanoseconds,
+        defaults to 8 times the longest configured one
+    :type max_interval: int
+    :param factor: interval multiplier per step
+    :type factor: float
+    :param high: queue depth that counts as lagging
+    :type high: int
+    :param low: queue depth that counts as caught up
+    :type low: int
+    :param max_lag: notification age in seconds that counts as lagging
+    :type max_lag: float
+    :param cooldown: minimum seconds between changes
+    :type cooldown: float
+    """
+
+    def __init__(self, session, paths: list, options: SubscribeOptions = {},
+                 max_interval: Optional[int] = None, factor: float = 2.0,
+                 high: int = DEFAULT_HIGH, low: int = DEFAULT_LOW,
+                 max_lag: Optional[float] = None,
+                 cooldown: float = DEFAULT_COOLDOWN,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.session = session
+        self.options = dict(options, mode="stream")
+        self.factor = factor
+        self.high = high
+        self.low = low
+        self.max_lag = max_lag
+        self.cooldown = cooldown
+        self.scale = 1.0
+        self.events: List[IntervalChange] = []
+
+        self._fixed = []
+        self._sampled = []
+        for entry in paths:
+            path, sub_options = split_entry(entry)
+            submode = sub_options.get("submode") or \
+                self.options.get("submode") or "on-change"
+            if submode == "sample":
+                # 0 leaves the interval to the target, scaling needs one
+                interval = sub_options.get("interval",
+                                           self.options.get("interval")) or \
+                    10**9
+                self._sampled.append((path, dict(sub_options,
+                                                 submode="sample"), interval))
+            else:
+                self._fixed.append(entry)
+
+        longest = max([i for _, _, i in self._sampled] or [0])
+        self.max_interval = max_interval or 8 * longest
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._call = None
+        self._calls: list = []
+        self._running = 0
+        self._changed = 0.0
+        self._lag = 0.0
+
+    @property
+    def intervals(self) -> list:
+        """(path, current interval) of the sample paths"""
+        return [(path, self._interval(base))
+                for path, _, base in self._sampled]
+
+    def _interval(self, base: int) -> int:
+        return int(min(base * self.scale, max(self.max_interval, base)))
+
+    def _put(self, item):
+        put_until(self._queue, item, self._done)
+
+    def _start(self, paths: list):
+        prepared = self.session.prepare_subscribe(paths, self.options)
+        call = self.session.open_stream(prepared)
+
+        def read():
+            try:
+                for response in call:
+                    self._put(response)
+            except grpc.RpcError as rpcerr:
+                # a replaced sample stream is cancelled on purpose
+                if rpcerr.code() != grpc.StatusCode.CANCELLED or \
+                        call in self._calls:
+                    self._put(rpcerr)
+                    return
+            self._put(None)
+
+        with self._lock:
+            self._calls.append(call)
+            self._running += 1
+        threading.Thread(target=read, daemon=True).start()
+        return call
+
+    def _subscribe_sampled(self):
+        paths = [(path, dict(sub_options, interval=self._interval(base)))
+                 for path, sub_options, base in self._sampled]
+        previous = self._call
+        self._call = self._start(paths)
+        if previous is not None:
+            with self._lock:
+                self._calls.remove(previous)
+            previous.cancel()
+
+    def _adjust(self):
+        now = time.monotonic()
+        if now - self._changed < self.cooldown or not self._sampled:
+            return
+
+        depth = self._queue.qsize()
+        lagging = depth >= self.high or \
+            (self.max_lag is not None and self._lag > self.max_lag)
+        caught_up = depth <= self.low and \
+            (self.max_lag is None or self._lag <= self.max_lag)
+
+        if lagging and any(self._interval(base) < self.max_interval
+                           for _, _, base in self._sampled):
+            self.scale *= self.factor
+            reason = "lag"
+        elif caught_up and self.scale != 1.0:
+            self.scale = 1.0
+            reason = "recovered"
+        else:
+            return
+
+        self._changed = now
+        self.events.append(IntervalChange(time.time(), self.scale, reason,
+                                          depth, self._lag))
+        self._subscribe_sampled()
+
+    def __iter__(self) -> Iterator[SubscribeResponse_]:
+        if self._fixed:
+            self._start(self._fixed)
+        if self._sampled:
+            self._subscribe_sampled()
+        self._changed = time.monotonic()
+
+        try:
+            while True:
+                with self._lock:
+                    if not self._running:
+                        return
+                item = self._queue.get()
+
+                if item is None:
+                    with self._lock:
+                        self._running -= 1
+                    continue
+                if isinstance(item, grpc.RpcError):
+                    raise GrpcError(Status_.from_call(item))
+
+                if item.HasField("update"):
+                    self._lag = max(time.time() - item.update.timestamp / 1e9,
+                                    0.0)
+                    self._adjust()
+                    yield SubscribeResponse_(item)
+        finally:
+            self.close()
+
+    def close(self):
+        """Cancel the underlying streams"""
+        self._done.set()
+        with self._lock:
+            calls, self._calls = self._calls, []
+        for call in calls:
+            call.cancel()
@@ -3,17 +3,25 @@
 # Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
+import collections
+from concurrent import futures
 from functools import partial
+from gnmi.batch import SetBatch
+from gnmi.capabilities import CapabilitiesCache
 from gnmi.constants import GRPC_CODE_MAP
-from gnmi.exceptions import GrpcDeadlineExceeded
-from typing import Any, List, Tuple, Optional
+from gnmi.exceptions import GrpcDeadlineExceeded, RolloutAborted
+from typing import Any, Iterator, List, Tuple, Optional
 
 from gnmi.session import Session
 from gnmi.structures import Auth, CertificateStore, GetOptions, Metadata
 from gnmi.structures import Options, SubscribeOptions, Target, GrpcOptions
 
 
-__all__ = ["capabilites", "delete", "get", "replace", "subscribe", "update"]
+__all__ = ["capabilites", "delete", "get", "replace", "rollout", "subscribe",
+           "update"]
+
+RolloutResult = collections.namedtuple("RolloutResult",
+                                       ("target", "response", "error"))
 
 def _new_session(hostaddr: str,
         auth: Auth = None,
@@ -43,10 +51,13 @@ def capabilites(hostaddr: str,
         auth: Auth = None,
         secure: bool = False,
         certificates: CertificateStore = {},
-        override: str = None):
+        override: str = None,
+        cache: Optional[CapabilitiesCache] = None):
     """
     Get supported models and encodings from target
 
+    A cached response is returned without connecting to the target.
+
     Usage::
 
         >>> capabilites("veos1:6030", auth=("admin", "p4ssw0rd"))
@@ -59,9 +70,17 @@ def capabilites(hostaddr: str,
     :type auth: gnmi.structures.CertificateStore
     :param override: override hostname
     :type override: str
+    :param cache: capabilities cache
+    :type cache: gnmi.capabilities.CapabilitiesCache
     """
+    if cache is not None:
+        cached = cache.get(hostaddr)
+        if cached is not None:
+            return cached
+
     sess = _new_session(hostaddr, auth, secure, certificates, override)
-    return sess.capabilities()
+    sess.capabilities_cache = cache
+    return sess.capabilities(refresh=True)
 
 def get(hostaddr: str,
         paths: list,
@@ -246,3 +265,98 @@ def update(hostaddr: str,
     """
     sess = _new_session(hostaddr, auth, secure, certificates, override)
     return sess.set(updates=updates, options=options)
+
+def rollout(hostaddrs: List[str],
+        deletes: List[str] = [],
+        replacements: List[Tuple[str, Any]] = [],
+        updates: List[Tuple[str, Any]] = [],
+        auth: Auth = None,
+        secure: bool = False,
+        certificates: CertificateStore = {},
+        override: str = None,
+        options: Options = {},
+        concurrency: int = 16,
+        waves: List[int] = []) -> Iterator[RolloutResult]:
+    """
+    Push the same Set to many targets
+
+    The SetRequest is built and serialized once and the same bytes are sent
+    to every target, at most `concurrency` at a time.  With `waves`, targets
+    are rolled out in canary waves of the given sizes followed by the rest,
+    and the rollout stops after a wave with a failure.
+
+    Results are yielded as targets complete, with either `response` (a
+    SetResponse_) or `error` set, a GrpcError or whatever else failed for
+    that target, such as an OSError connecting to it.  Targets skipped after
+    a failed wave are yielded with a RolloutAborted error.
+
+    Usage::
+
+        >>> updates = [("/system/config", {"domain-name": "lab"})]
+        >>> for result in rollout(["veos1:6030", "veos2:6030"], updates=updates,
+        ...         auth=("admin", "p4ssw0rd"), waves=[1]):
+        ...     print(result.target, result.error or "ok")
+
+    :param hostaddrs: gNMI targets
+    :type hostaddrs: list
+    :param deletes: paths to delete
+    :type deletes: list
+    :param replacements: replace path, value
+    :type replacements: list
+    :param updates: update path, value
+    :type updates: list
+    :param auth: username and password
+    :type auth: tuple
+    :param certificates: SSL certificates
+    :type certificates: gnmi.structures.CertificateStore
+    :param override: override hostname
+    :type override: str
+    :param options: Set options
+    :type options: gnmi.structures.Options
+    :param concurrency: maximum targets in flight
+    :type concurrency: int
+    :param waves: sizes of the canary waves
+    :type waves: list
+    """
+    batch = SetBatch(prefix=options.get("prefix"))
+    batch.extend(deletes=deletes, replacements=replacements, updates=updates)
+    requests = list(batch.requests())
+    if len(requests) != 1:
+        raise ValueError("Operations do not fit in a single SetRequest")
+    request = requests[0].SerializeToString()
+
+    def _push(hostaddr):
+        # any failure is the result of its target, never of the rollout
+        try:
+            sess = _new_session(hostaddr, auth, secure, certificates, override)
+        except Exception as err:
+            return RolloutResult(hostaddr, None, err)
+        try:
+            return RolloutResult(hostaddr, sess.set_serialized(request), None)
+        except Exception as err:
+            return RolloutResult(hostaddr, None, err)
+        finally:
+            sess.close()
+
+    groups = []
+    pos = 0
+    for size in waves:
+        groups.append(hostaddrs[pos:pos + size])
+        pos += size
+    groups.append(hostaddrs[pos:])
+
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for num, group in enumerate(groups):
+            failed = False
+            for future in futures.as_completed(
+                    [executor.submit(_push, h) for h in group]):
+                result = future.result()
+                failed = failed or result.error is not None
+                yield result
+
+            if failed and num < len(groups) - 1:
+                for group_ in groups[num + 1:]:
+                    for hostaddr in group_:
+                        yield RolloutResult(hostaddr, None,
+                                            RolloutAborted(hostaddr))
+                return
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.batch
+~~~~~~~~~~~~~~~~
+
+Size-bounded Set batches
+
+"""
+
+import decimal
+import json
+
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.index import path_matches
+from gnmi.messages import Path_, Update_, encode_updates
+
+# gRPC rejects messages over 4MB by default
+DEFAULT_MAX_SIZE = 4 * 1024 * 1024
+
+_OPERATIONS = ["delete", "replace", "update"]
+
+COALESCE_MODES = ["json_ietf", "auto"]
+
+
+def _varint_size(value: int) -> int:
+    size = 1
+    while value > 0x7f:
+        value >>= 7
+        size += 1
+    return size
+
+
+def _field_size(message) -> int:
+    # tag, length and body of a length-delimited field
+    size = message.ByteSize()
+    return 1 + _varint_size(size) + size
+
+
+def build_path(path):
+    """Return a gnmi.Path from a path string or `Path_`"""
+    if isinstance(path, Path_):
+        return path.raw
+    if isinstance(path, str):
+        return Path_.from_string(path).raw
+    if isinstance(path, pb.Path):
+        return path
+    raise ValueError("Failed to parse path: %s" % str(path))
+
+
+def build_update(update, cache: Optional[dict] = None):
+    """Return a gnmi.Update from a (path, value[, type]) tuple or `Update_`
+
+    `cache` holds parsed paths shared between calls, see
+    `gnmi.messages.encode_updates`.
+    """
+    if isinstance(update, Update_):
+        return update.raw
+    if isinstance(update, pb.Update):
+        return update
+    if isinstance(update, (list, tuple)):
+        return encode_updates([update], cache)[0]
+    raise ValueError("Failed to build update: %s" % str(update))
+
+
+def _container(update) -> Optional[Tuple[str, str]]:
+    # (parent, leaf) of a (path, value) update that may join its parent's
+    # JSON-IETF container, `None` when it must be sent as is
+    if not isinstance(update, (list, tuple)) or len(update) != 2:
+        return None
+    path, value = update
+    if not isinstance(path, str) or "\\" in path or \
+            isinstance(value, (bytes, decimal.Decimal)):
+        return None
+    # JSON-IETF encodes 64-bit integers and decimal64 as strings, smaller
+    # ones as numbers, which of them a leaf is depends on its schema
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return None
+    parent, _, leaf = path.rpartition("/")
+    # a keyed leaf is a list entry of its own
+    if not parent or not leaf or "[" in leaf:
+        return None
+    return parent, leaf
+
+
+def _block(groups: dict, path: str):
+    # leaves merged into a group move to its first leaf, so they must not
+    # pass a later update that overlaps them
+    for parent, group in list(groups.items()):
+        if path_matches(group[3], path):
+            # the update covers the whole group
+            del groups[parent]
+        elif path_matches(path, group[3]):
+            rest = path[len(group[3]):]
+            if rest.startswith("["):
+                del groups[parent]
+            else:
+                group[4].add(rest[1:].split("/")[0].split("[")[0])
+
+
+def coalesce(updates: Iterable, mode: str = "json_ietf",
+             cache: Optional[dict] = None) -> List[pb.Update]:  # type: ignore
+    r"""Merge sibling leaf updates into one JSON-IETF update per container
+
+    (path, value) leaves sharing a parent container are sent as a single
+    `json_ietf_val` update of the parent.  Leaves of different list entries
+    have different parents and stay apart.  Updates with an explicit type,
+    numeric, bytes or decimal values, and `Update_`s are passed through.
+    Leaves never move ahead of a passed through update that overlaps them,
+    they start a new group after it, so the value that wins stays the same.
+    JSON-IETF sends int64, uint64 and decimal64 leaves as strings and
+    narrower integers as numbers, so without the schema a number cannot be
+    merged without possibly changing its wire type.
+
+    Only use this for updates: a container replace would also remove the
+    leaves that are not part of it.
+
+    Usage::
+
+        In [1]: from gnmi.batch import coalesce
+        In [2]: updates = coalesce([
+           ...:     ("/interfaces/interface[name=Ethernet1]/config/description",
+           ...:      "uplink"),
+           ...:     ("/interfaces/interface[name=Ethernet1]/config/enabled", True)])
+        In [3]: len(updates)
+        Out[3]: 1
+
+    :param updates: (path, value) leaves or anything `build_update` accepts
+    :param mode: "json_ietf" to always coalesce, "auto" to coalesce a
+        container only when it serializes smaller than its leaves
+    :type mode: str
+    :param cache: parsed paths, see `gnmi.messages.encode_updates`
+    :type cache: dict
+    :rtype: list of gnmi.Update
+    """
+    if mode not in COALESCE_MODES:
+        raise ValueError("Invalid coalesce mode: %s" % mode)
+    if cache is None:
+        cache = {}
+
+    # each entry is a passed through update or a [parent, leaves, updates,
+    # path string, blocked leaves] group, groups sit at the position of
+    # their first leaf
+    entries: list = []
+    groups: dict = {}
+    for update in updates:
+        container = _container(update)
+        if container is None:
+            built = build_update(update, cache)
+            entries.append(built)
+            if groups:
+                _block(groups, Path_(built.path).to_string())
+            continue
+        parent, leaf = container
+        group = groups.get(parent)
+        if group is not None and leaf in group[4]:
+            # the leaf must stay after the update that blocked it
+            group = None
+        if group is None:
+            path = cache.get(parent)
+            if path is None:
+                path = cache[parent] = build_path(parent)
+            group = groups[parent] = [parent, {}, [], Path_(path).to_string(),
+                                      set()]
+            entries.append(group)
+        # a repeated leaf is sent once, with its last value
+        group[1][leaf] = update[1]
+        group[2].append(update)
+
+    result = []
+    for entry in entries:
+        if not isinstance(entry, list):
+            result.append(entry)
+            continue
+        parent, leaves, leaf_updates = entry[:3]
+        if len(leaf_updates) == 1:
+            result.extend(encode_updates(leaf_updates, cache))
+            continue
+
+        path = cache.get(parent)
+        if path is None:
+            path = cache[parent] = build_path(parent)
+        merged = pb.Update(path=path, val=pb.TypedValue(
+            json_ietf_val=json.dumps(leaves).encode()))
+        if mode == "auto":
+            separate = encode_updates(leaf_updates, cache)
+            if sum(_field_size(u) for u in separate) < _field_size(merged):
+                result.extend(separate)
+                continue
+        result.append(merged)
+
+    return result
+
+
+class SetBatch(object):
+    r"""Collects deletes, replacements and updates for one or more
+    SetRequests
+
+    Paths are parsed as operations are added.  `requests` splits the batch
+    into SetRequests no larger than `max_size` while keeping the order of
+    operations: a request applies its deletes, then replacements, then
+    updates, so an operation that would be reordered starts a new request.
+
+    Usage::
+
+        In [1]: from gnmi.batch import SetBatch
+        In [2]: batch = SetBatch(prefix="/acl/acl-sets")
+        In [3]: for seq, entry in enumerate(entries):
+           ...:     batch.update(("/acl-set[name=edge][type=ACL_IPV4]"
+           ...:         "/acl-entries/acl-entry[sequence-id=%d]" % seq, entry))
+        In [4]: resp = sess.set_batch(batch)
+
+    :param prefix: prefix shared by every request
+    :type prefix: str
+    :param max_size: maximum serialized size of a request in bytes
+    :type max_size: int
+    """
+
+    def __init__(self, prefix=None, max_size: int = DEFAULT_MAX_SIZE):
+        self.prefix = build_path(prefix or "")
+        self.max_size = max_size
+        self._operations: List[Tuple[int, object, int]] = []
+        self._paths: dict = {}
+
+    def __len__(self):
+        return len(self._operations)
+
+    def _add(self, operation: str, message):
+        size = _field_size(message)
+        if size + _field_size(self.prefix) > self.max_size:
+            raise ValueError("Operation exceeds max_size: %d bytes" % size)
+        self._operations.append((_OPERATIONS.index(operation), message, size))
+
+    def delete(self, path):
+        """Add a delete of `path`"""
+        self._add("delete", build_path(path))
+        return self
+
+    def replace(self, update):
+        """Add a replacement from a (path, value) tuple or `Update_`"""
+        self._add("replace", build_update(update, self._paths))
+        return self
+
+    def update(self, update):
+        """Add an update from a (path, value) tuple or `Update_`"""
+        self._add("update", build_update(update, self._paths))
+        return self
+
+    def extend(self, deletes: list = [], replacements: list = [],
+               updates: list = []):
+        """Add operations in the order Session.set applies them"""
+        for path in deletes:
+            self.delete(path)
+        for update in replacements:
+            self.replace(update)
+        for update in updates:
+            self.update(update)
+        return self
+
+    def requests(self) -> Iterator[pb.SetRequest]:  # type: ignore
+        """Yield the SetRequests of the batch in order"""
+        base = _field_size(self.prefix)
+        chunk: dict = {name: [] for name in _OPERATIONS}
+        size = base
+        last = 0
+
+        for operation, message, msize in self._operations:
+            if size > base and (operation < last or
+                                size + msize > self.max_size):
+                yield pb.SetRequest(prefix=self.prefix, **chunk)
+                chunk = {name: [] for name in _OPERATIONS}
+                size = base
+
+            chunk[_OPERATIONS[operation]].append(message)
+            size += msize
+            last = operation
+
+        if size > base:
+            yield pb.SetRequest(prefix=self.prefix, **chunk)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.cache
+~~~~~~~~~~~~~~~~
+
+Read-through cache for Get results
+
+"""
+
+import collections
+import threading
+import time
+
+from typing import Optional, Tuple
+
+from gnmi.index import path_matches
+
+DEFAULT_TTL = 5.0
+DEFAULT_MAXSIZE = 1024
+
+# (target, path, type, encoding, models)
+Key = Tuple[str, str, int, int, tuple]
+
+
+def _split_origin(path: str) -> Tuple[str, str]:
+    # "origin:/elem/..." as written by Path_.to_string
+    if path.startswith("/"):
+        return "", path
+    origin, sep, rest = path.partition(":")
+    if not sep:
+        return "", path
+    return origin, rest
+
+
+class GetCache(object):
+    r"""Size-bounded LRU cache of Get notifications with per-entry TTL
+
+    Pass it to a :class:`gnmi.session.Session` to serve repeated Gets from
+    memory.  Every Set through that session invalidates the entries of
+    overlapping paths.
+
+    Usage::
+
+        In [1]: from gnmi.cache import GetCache
+        In [2]: sess = Session(("veos3", 6030), cache=GetCache(ttl=10))
+
+    :param ttl: default time to live of an entry in seconds
+    :type ttl: float
+    :param maxsize: maximum number of entries
+    :type maxsize: int
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL,
+                 maxsize: int = DEFAULT_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Key):
+        """Return the cached notification for `key` or `None`"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, notification = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return notification
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Key, notification, ttl: Optional[float] = None):
+        """Cache a notification for `ttl` seconds (default: `self.ttl`)"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, notification)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, target: str, path: str = ""):
+        """Drop the entries of `target` that overlap `path`
+
+        An entry overlaps when it has the same origin and either path is
+        within the other's subtree.  The root path of an origin drops every
+        entry of the target with that origin.
+        """
+        origin, path = _split_origin(path)
+        path = path.rstrip("/")
+        with self._lock:
+            for key in list(self._entries):
+                if key[0] != target:
+                    continue
+                key_origin, key_path = _split_origin(key[1])
+                if key_origin != origin:
+                    continue
+                if path_matches(key_path, path) or \
+                        path_matches(path, key_path):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
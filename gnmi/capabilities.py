@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.capabilities
+~~~~~~~~~~~~~~~~
+
+On-disk cache of Capabilities responses
+
+"""
+
+import base64
+import json
+import os
+import re
+import threading
+import time
+
+from typing import List, Optional
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi import util
+from gnmi.messages import CapabilitiesResponse_
+
+# a day
+DEFAULT_TTL = 86400.0
+
+
+def version_key(version: str) -> tuple:
+    """Sort key of a dotted model version, "2.10.0" sorts after "2.9.1"
+    """
+    return tuple(int(part) for part in re.findall(r"\d+", version))
+
+
+class CapabilitiesCache(object):
+    r"""Capabilities responses of many targets persisted in a JSON file
+
+    Entries are keyed by target ("host:port") and expire after `ttl`
+    seconds.  A response reporting another gNMI version than the cached one
+    replaces the entry, and `get` can reject entries of an unexpected
+    version.  The model and encoding inventory is kept in plain JSON so
+    queries do not decode any protobuf.
+
+    Usage::
+
+        In [1]: from gnmi.capabilities import CapabilitiesCache
+        In [2]: caps = CapabilitiesCache("/var/tmp/gnmi-capabilities.json")
+        In [3]: sess = Session(("veos3", 6030), capabilities_cache=caps)
+        In [4]: sess.capabilities()  # from the target, then from the cache
+        In [5]: caps.supporting("openconfig-bgp", "6.0.0")
+        Out[5]: ['veos3:6030']
+
+    :param file: JSON file, created on first write
+    :type file: str
+    :param ttl: time to live of an entry in seconds, `None` never expires
+    :type ttl: float
+    """
+
+    def __init__(self, file: str, ttl: Optional[float] = DEFAULT_TTL):
+        self.file = file
+        self.ttl = ttl
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, target: str):
+        return self._entry(target) is not None
+
+    @property
+    def targets(self) -> List[str]:
+        return sorted(t for t in self._entries if self._entry(t) is not None)
+
+    def load(self):
+        """(Re)load the entries from `file`"""
+        entries = {}
+        if os.path.exists(self.file):
+            with open(self.file) as fh:
+                try:
+                    entries = json.load(fh)
+                except ValueError:
+                    # an unreadable cache is an empty one
+                    entries = {}
+        with self._lock:
+            self._entries = entries
+
+    def save(self):
+        """Write the entries to `file`"""
+        with self._lock:
+            data = json.dumps(self._entries, sort_keys=True)
+        directory = os.path.dirname(self.file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.file + ".tmp", "w") as fh:
+            fh.write(data)
+        os.replace(self.file + ".tmp", self.file)
+
+    def _entry(self, target: str, version: Optional[str] = None):
+        entry = self._entries.get(target)
+        if entry is None:
+            return None
+        if self.ttl is not None and entry["timestamp"] + self.ttl < time.time():
+            return None
+        if version is not None and entry["version"] != version:
+            return None
+        return entry
+
+    def get(self, target: str, version: Optional[str] = None
+            ) -> Optional[CapabilitiesResponse_]:
+        """Return the cached response of `target`, `None` when missing,
+        expired, or not of gNMI `version`
+        """
+        entry = self._entry(target, version)
+        if entry is None:
+            return None
+        return CapabilitiesResponse_(pb.CapabilityResponse.FromString(
+            base64.b64decode(entry["response"])))
+
+    def put(self, target: str, response, save: bool = True) -> bool:
+        """Cache the response of `target`
+
+        :param response: Capabilities response
+        :type response: gnmi.messages.CapabilitiesResponse_
+        :param save: write the file
+        :type save: bool
+        :rtype: `True` when the gNMI version of the target changed
+        """
+        if isinstance(response, CapabilitiesResponse_):
+            response = response.raw
+
+        entry = {
+            "timestamp": time.time(),
+            "version": response.gNMI_version,
+            "encodings": list(response.supported_encodings),
+            "models": [[m.name, m.organization, m.version]
+                       for m in response.supported_models],
+            "response": base64.b64encode(
+                response.SerializeToString()).decode()
+        }
+        with self._lock:
+            previous = self._entries.get(target)
+            self._entries[target] = entry
+
+        if save:
+            self.save()
+
+        return previous is not None and \
+            previous["version"] != response.gNMI_version
+
+    def invalidate(self, target: str, save: bool = True):
+        """Drop the entry of `target`"""
+        with self._lock:
+            self._entries.pop(target, None)
+        if save:
+            self.save()
+
+    def clear(self, save: bool = True):
+        with self._lock:
+            self._entries.clear()
+        if save:
+            self.save()
+
+    def supporting(self, model: str, version: str = "",
+                   encoding: Optional[str] = None) -> List[str]:
+        """Targets supporting `model` at `version` or later
+
+        Models without a version only match when no version is asked for.
+
+        :param model: model name
+        :type model: str
+        :param version: minimum model version
+        :type version: str
+        :param encoding: also require this encoding, e.g. "json_ietf"
+        :type encoding: str
+        :rtype: list of targets
+        """
+        minimum = version_key(version)
+        if encoding is not None:
+            encoding = util.get_gnmi_constant(encoding)
+
+        targets = []
+        for target in self.targets:
+            entry = self._entries[target]
+            if encoding is not None and encoding not in entry["encodings"]:
+                continue
+            for name, _, model_version in entry["models"]:
+                if name != model:
+                    continue
+                if not minimum or (model_version and
+                                   version_key(model_version) >= minimum):
+                    targets.append(target)
+                    break
+
+        return targets
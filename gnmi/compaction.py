@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.compaction
+~~~~~~~~~~~~~~~~
+
+Keyframes and retention for recordings
+
+A keyframe is the full state of every target at a point in time, built
+with a :class:`gnmi.state.StateCache` and stored next to the segments as
+``<timestamp>.kf`` in the segment format.  The state at any time is the
+nearest keyframe at or before it plus the recorded deltas after that
+keyframe.
+
+"""
+
+import bisect
+import os
+
+from typing import List, Optional, Tuple
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.index import SegmentIndex, index_file
+from gnmi.recorder import MAGIC, Reader, encode_block, pack_record
+from gnmi.recorder import segment_name
+from gnmi.state import StateCache
+
+KEYFRAME_SUFFIX = ".kf"
+DEFAULT_INTERVAL = 3600 * 1000000000
+
+
+class Compactor(object):
+    r"""Writes keyframes for a recording and folds away old deltas
+
+    Usage::
+
+        In [1]: from gnmi.compaction import Compactor
+        In [2]: compactor = Compactor("/var/tmp/capture",
+           ...:     interval=15 * 60 * 1000000000)
+        In [3]: compactor.build()
+        In [4]: state = compactor.state_at(1588006800000000000)
+        In [5]: state.get("/system/config/hostname", target="veos3:6030")
+
+    :param directory: recording directory
+    :type directory: str
+    :param interval: keyframe interval in nanoseconds, keyframes are aligned
+        to multiples of the interval
+    :type interval: int
+    """
+
+    def __init__(self, directory: str, interval: int = DEFAULT_INTERVAL,
+                 chunk_size: int = 1000, compression: Optional[str] = "zlib"):
+        self.directory = directory
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.compression = compression
+        self._reader = Reader(directory)
+
+    @property
+    def keyframes(self) -> List[Tuple[int, str]]:
+        """(timestamp, file) of every keyframe in time order"""
+        names = [n for n in os.listdir(self.directory)
+                 if n.endswith(KEYFRAME_SUFFIX)]
+        return sorted((int(n[:-len(KEYFRAME_SUFFIX)]),
+                       os.path.join(self.directory, n)) for n in names)
+
+    def _keyframe_before(self, timestamp: Optional[int]):
+        keyframes = self.keyframes
+        if timestamp is not None:
+            pos = bisect.bisect_right([t for t, _ in keyframes], timestamp)
+            keyframes = keyframes[:pos]
+        return keyframes[-1] if keyframes else (None, None)
+
+    def load_keyframe(self, file: str) -> StateCache:
+        state = StateCache()
+        for record in self._reader.read_segment(file):
+            state.apply(record.response, record.target)
+        return state
+
+    def write_keyframe(self, state: StateCache, timestamp: int) -> str:
+        """Write `state` as the keyframe for `timestamp`"""
+        file = os.path.join(self.directory,
+                            "%020d%s" % (timestamp, KEYFRAME_SUFFIX))
+
+        with open(file + ".tmp", "wb") as fh:
+            fh.write(MAGIC)
+            for target in state.targets:
+                for notif in state.notifications(target, timestamp,
+                                                 self.chunk_size):
+                    data = pb.SubscribeResponse(update=notif).SerializeToString()
+                    fh.write(encode_block(pack_record(timestamp, target, data),
+                                          self.compression))
+        os.replace(file + ".tmp", file)
+
+        return file
+
+    def build(self) -> List[str]:
+        """Write keyframes for every interval boundary crossed since the
+        latest keyframe
+
+        A keyframe is only written once a record at or after its boundary has
+        been recorded, so it never misses late deltas of its interval.
+
+        :rtype: list of keyframe files written
+        """
+        written = []
+        start, file = self._keyframe_before(None)
+        state = self.load_keyframe(file) if file else StateCache()
+
+        boundary = None
+        if start is not None:
+            boundary = start + self.interval
+
+        for record in self._reader.query(start=start):
+            if boundary is None:
+                boundary = (record.timestamp // self.interval + 1) * self.interval
+            if record.timestamp >= boundary:
+                # nothing changed between skipped boundaries, write the last
+                boundary += (record.timestamp - boundary) // self.interval * \
+                    self.interval
+                written.append(self.write_keyframe(state, boundary))
+                boundary += self.interval
+            state.apply(record.response, record.target)
+
+        return written
+
+    def state_at(self, timestamp: int) -> StateCache:
+        """Rebuild the state of all targets from records received before
+        `timestamp`
+        """
+        start, file = self._keyframe_before(timestamp)
+
+        if start is None:
+            # folding removes segments from the front of the recording
+            segments = self._reader.segments
+            if segments and os.path.basename(segments[0]) != segment_name(0):
+                raise ValueError("State before %d was folded away" % timestamp)
+            state = StateCache()
+        else:
+            state = self.load_keyframe(file)
+
+        for record in self._reader.query(start=start, end=timestamp):
+            state.apply(record.response, record.target)
+
+        return state
+
+    def _last_timestamp(self, segment: str) -> Optional[int]:
+        # the index has the last receive time of every block, segments
+        # without a complete index are scanned
+        file = index_file(segment)
+        if os.path.exists(file):
+            index = SegmentIndex.load(file)
+            if index.blocks and index.end >= os.path.getsize(segment):
+                return max(block.last for block in index.blocks)
+        return max((r.timestamp for r in self._reader.read_segment(segment)),
+                   default=None)
+
+    def fold(self, horizon: int) -> List[str]:
+        """Remove deltas and keyframes no longer needed to rebuild state at
+        or after `horizon`
+
+        Segments are removed whole, once all of their records are older than
+        the latest keyframe at or before `horizon`.
+
+        :rtype: list of removed files
+        """
+        removed: List[str] = []
+        keyframe, _ = self._keyframe_before(horizon)
+        if keyframe is None:
+            return removed
+
+        for timestamp, file in self.keyframes:
+            if timestamp < keyframe:
+                os.remove(file)
+                removed.append(file)
+
+        # the last segment is still being written to
+        for segment in self._reader.segments[:-1]:
+            last = self._last_timestamp(segment)
+            if last is not None and last >= keyframe:
+                break
+            for file in (segment, index_file(segment)):
+                if os.path.exists(file):
+                    os.remove(file)
+                    removed.append(file)
+
+        return removed
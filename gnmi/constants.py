@@ -23,4 +23,13 @@ DATA_TYPE_MAP: Final[List[str]] = [
     "config",
     "state",
     "operational"
-]
\ No newline at end of file
+]
+
+# "auto" encoding picks the first one the target supports, scalar values of
+# PROTO skip JSON parsing altogether
+ENCODING_PREFERENCE: Final[List[str]] = [
+    "proto",
+    "json_ietf",
+    "json",
+    "ascii"
+]
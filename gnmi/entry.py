@@ -49,8 +49,10 @@ def parse_args():
     
     group = parser.add_argument_group("Common options")
     group.add_argument("--encoding", default="json", type=str,
-                       choices=["json", "bytes", "proto", "ascii", "json-ietf"],
-                       help="set encoding")
+                       choices=["json", "bytes", "proto", "ascii", "json-ietf",
+                                "auto"],
+                       help="set encoding, auto picks the cheapest to decode "
+                            "the target supports")
     
     group.add_argument("--prefix", default="", type=str,
                        help="gRPC path prefix (default: <empty>)")
@@ -6,5 +6,19 @@ class GrpcError(Exception):
     def __init__(self, status):
         super(GrpcError, self).__init__("%s: %s" %
                                         (status.code, status.details))
+        self.status = status
 
 class GrpcDeadlineExceeded(GrpcError): ...
+
+class RolloutAborted(Exception):
+    def __init__(self, target):
+        super(RolloutAborted, self).__init__(
+            "%s: not attempted, an earlier wave failed" % target)
+        self.target = target
+
+class SubscriptionStalled(Exception):
+    def __init__(self, stream, idle):
+        super(SubscriptionStalled, self).__init__(
+            "stream %d: silent for %.1fs, out of restarts" % (stream, idle))
+        self.stream = stream
+        self.idle = idle
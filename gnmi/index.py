@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.index
+~~~~~~~~~~~~~~~~
+
+Sidecar time and path index for recording segments
+
+Records in a segment are written in blocks (see :mod:`gnmi.recorder`).
+For every block the index keeps its byte range, the first and last
+receive time and a posting list of interned path IDs touched by the block.
+Path IDs are assigned in order of first appearance, so periodic telemetry
+touches long runs of consecutive IDs and posting lists are stored as
+``[start, stop)`` ranges.  The index file sits next to its segment and is
+written as JSON lines while recording::
+
+    {"id": 0, "path": "/interfaces/interface[name=Ethernet1]/state/mtu"}
+    {"offset": 8, "end": 65621, "first": ..., "last": ..., "count": 412,
+     "paths": [[0, 3], [7, 8]]}
+
+"""
+
+import bisect
+import collections
+import json
+import os
+
+from typing import Iterator, List, Optional, Set
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.messages import Path_
+
+INDEX_SUFFIX = ".idx"
+
+Block = collections.namedtuple("Block",
+                               ("offset", "end", "first", "last", "count",
+                                "paths"))
+
+
+def index_file(segment: str) -> str:
+    """Return the index file name for `segment`"""
+    return os.path.splitext(segment)[0] + INDEX_SUFFIX
+
+
+def _varint(buf, pos: int):
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(buf, pos: int, end: int):
+    # yields (field number, start, end) of length-delimited fields only
+    while pos < end:
+        key, pos = _varint(buf, pos)
+        wire_type = key & 0x7
+        if wire_type == 2:
+            length, pos = _varint(buf, pos)
+            yield key >> 3, pos, pos + length
+            pos += length
+        elif wire_type == 0:
+            _, pos = _varint(buf, pos)
+        elif wire_type == 1:
+            pos += 8
+        elif wire_type == 5:
+            pos += 4
+        else:
+            raise ValueError("Unsupported wire type: %d" % wire_type)
+
+
+def _notifications(data: bytes):
+    # yields (prefix, [path, ...]) raw bytes of each notification
+    for field, start, end in _fields(data, 0, len(data)):
+        if field != 1:  # SubscribeResponse.update
+            continue
+
+        prefix = b""
+        paths = []
+        for nfield, nstart, nend in _fields(data, start, end):
+            if nfield == 2:  # Notification.prefix
+                prefix = data[nstart:nend]
+            elif nfield == 4:  # Notification.update
+                for ufield, ustart, uend in _fields(data, nstart, nend):
+                    if ufield == 1:  # Update.path
+                        paths.append(data[ustart:uend])
+                        break
+                else:
+                    paths.append(b"")
+            elif nfield == 5:  # Notification.delete
+                paths.append(data[nstart:nend])
+
+        yield prefix, paths
+
+
+def _path_string(path: bytes, cache: dict) -> str:
+    name = cache.get(path)
+    if name is None:
+        name = cache[path] = Path_(pb.Path.FromString(path)).to_string()
+    return name
+
+
+def response_paths(data: bytes, cache: dict) -> Iterator[str]:
+    """Yield the full paths touched by a serialized gnmi.SubscribeResponse
+
+    Only the path fields are located on the wire, values are never decoded.
+    `cache` maps raw path bytes to path strings and should be kept between
+    calls.
+    """
+    for prefix, paths in _notifications(data):
+        prefix_ = _path_string(prefix, cache)
+        for path in paths:
+            yield prefix_ + _path_string(path, cache)
+
+
+def response_matches(data: bytes, query: str, cache: dict) -> bool:
+    """True if a serialized gnmi.SubscribeResponse touches `query`
+
+    Like `response_paths` but update paths are only looked at when the
+    notification prefix is an ancestor of `query`.
+    """
+    for prefix, paths in _notifications(data):
+        prefix_ = _path_string(prefix, cache)
+        if path_matches(prefix_, query):
+            if paths:
+                return True
+        elif path_matches(query, prefix_):
+            for path in paths:
+                if path_matches(prefix_ + _path_string(path, cache), query):
+                    return True
+    return False
+
+
+def _to_ranges(ids) -> tuple:
+    ranges: list = []
+    for id_ in sorted(ids):
+        if ranges and ranges[-1][1] == id_:
+            ranges[-1][1] = id_ + 1
+        else:
+            ranges.append([id_, id_ + 1])
+    return tuple(tuple(r) for r in ranges)
+
+
+def _in_ranges(ranges: tuple, ids: Set[int]) -> bool:
+    for id_ in ids:
+        pos = bisect.bisect_right(ranges, (id_, float("inf"))) - 1
+        if pos >= 0 and id_ < ranges[pos][1]:
+            return True
+    return False
+
+
+def path_matches(path: str, query: str) -> bool:
+    """True if `path` is `query` or lies within its subtree"""
+    if not path.startswith(query):
+        return False
+    return len(path) == len(query) or path[len(query)] in "/["
+
+
+class SegmentIndex(object):
+    r"""In-memory view of a segment index
+
+    """
+
+    def __init__(self):
+        self.ids: dict = {}
+        self.names: List[str] = []
+        self.blocks: List[Block] = []
+        # running maximum of block end times, used to bisect on start time
+        self._horizon: List[int] = []
+
+    @property
+    def end(self) -> int:
+        """Offset up to which the segment is indexed"""
+        return self.blocks[-1].end if self.blocks else 0
+
+    def intern(self, path: str) -> int:
+        id_ = self.ids.get(path)
+        if id_ is None:
+            id_ = self.ids[path] = len(self.names)
+            self.names.append(path)
+        return id_
+
+    def add_block(self, block: Block):
+        last = block.last
+        if self._horizon:
+            last = max(last, self._horizon[-1])
+        self.blocks.append(block)
+        self._horizon.append(last)
+
+    def match(self, query: str) -> Set[int]:
+        """Return IDs of all interned paths within `query`"""
+        return {id_ for id_, name in enumerate(self.names)
+                if path_matches(name, query)}
+
+    def search(self, start: Optional[int] = None, end: Optional[int] = None,
+               ids: Optional[Set[int]] = None) -> Iterator[Block]:
+        """Yield blocks that may hold records in [start, end) touching `ids`
+
+        :param start: receive time in nanoseconds (inclusive)
+        :param end: receive time in nanoseconds (exclusive)
+        :param ids: path IDs from `match`, `None` matches every path
+        """
+        pos = 0
+        if start is not None:
+            pos = bisect.bisect_left(self._horizon, start)
+
+        for block in self.blocks[pos:]:
+            if start is not None and block.last < start:
+                continue
+            if end is not None and block.first >= end:
+                continue
+            if ids is not None and not _in_ranges(block.paths, ids):
+                continue
+            yield block
+
+    @classmethod
+    def load(cls, file: str) -> "SegmentIndex":
+        index = cls()
+
+        with open(file, "r") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # truncated by a crash while recording
+                    break
+                if "path" in entry:
+                    index.intern(entry["path"])
+                else:
+                    entry["paths"] = tuple(tuple(r) for r in entry["paths"])
+                    index.add_block(Block(**entry))
+
+        return index
+
+
+class IndexWriter(object):
+    r"""Builds the index of a segment while it is being recorded
+
+    """
+
+    def __init__(self, file: str):
+        self.index = SegmentIndex()
+        self._fh = open(file, "w")
+        self._names: dict = {}
+        self._reset()
+
+    def _reset(self):
+        self._first: Optional[int] = None
+        self._last: Optional[int] = None
+        self._count = 0
+        self._paths: Set[int] = set()
+
+    def add(self, timestamp: int, data: bytes):
+        """Add a record to the current block
+
+        :param data: the serialized gnmi.SubscribeResponse of the record
+        """
+        if self._first is None or timestamp < self._first:
+            self._first = timestamp
+        if self._last is None or timestamp > self._last:
+            self._last = timestamp
+
+        for path in response_paths(data, self._names):
+            id_ = self.index.ids.get(path)
+            if id_ is None:
+                id_ = self.index.intern(path)
+                self._fh.write(json.dumps({"id": id_, "path": path}) + "\n")
+            self._paths.add(id_)
+
+        self._count += 1
+
+    def close_block(self, offset: int, end: int):
+        """Index the current block as stored at [offset, end)"""
+        if not self._count:
+            return
+
+        block = Block(offset, end, self._first, self._last,
+                      self._count, _to_ranges(self._paths))
+        self.index.add_block(block)
+
+        entry = block._asdict()
+        self._fh.write(json.dumps(entry) + "\n")
+        self._fh.flush()
+
+        self._reset()
+
+    def close(self):
+        if not self._fh.closed:
+            self._fh.close()
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.lanes
+~~~~~~~~~~~~~~~~
+
+Priority lanes for subscription processing
+
+"""
+
+import collections
+import threading
+
+from typing import Dict, Iterator, Optional
+
+import grpc
+
+from gnmi.messages import Status_, SubscribeResponse_
+from gnmi.exceptions import GrpcError
+from gnmi.planner import split_entry
+from gnmi.structures import SubscribeOptions
+
+DEFAULT_LANE_SIZE = 10000
+
+SCHEDULING = ["strict", "weighted"]
+
+
+class _Lane(object):
+
+    def __init__(self, priority: int, weight: int):
+        self.priority = priority
+        self.weight = weight
+        self.items: collections.deque = collections.deque()
+        self.running = True
+        self.delivered = 0
+
+
+class PrioritySubscription(object):
+    r"""Subscription whose paths are delivered through per-priority lanes
+
+    Paths are grouped by the `priority` of their options, lower values are
+    more urgent.  Each priority has its own stream to the target and its own
+    queue, so a flood of samples on one lane never delays another lane's
+    updates behind it.  With "strict" scheduling the consumer always gets
+    the most urgent waiting response.  With "weighted" scheduling each lane
+    in turn gets up to its weight of responses, so bulk lanes still make
+    progress.
+
+    Usage::
+
+        In [1]: from gnmi.lanes import PrioritySubscription
+        In [2]: sub = PrioritySubscription(sess, [
+           ...:     ("/interfaces/interface/state/oper-status", {"priority": 0}),
+           ...:     ("/network-instances/network-instance/protocols/protocol"
+           ...:      "/bgp/neighbors/neighbor/state/session-state",
+           ...:      {"priority": 0}),
+           ...:     ("/interfaces/interface/state/counters",
+           ...:      {"priority": 1, "submode": "sample",
+           ...:       "interval": 10**9}),
+           ...: ])
+        In [3]: for resp in sub:
+           ...:     ...
+
+    :param session: session to the target
+    :type session: gnmi.session.Session
+    :param paths: paths or (path, SubscriptionOptions) tuples
+    :type paths: list
+    :param options: subscription options shared by every lane
+    :type options: gnmi.structures.SubscribeOptions
+    :param scheduling: "strict" or "weighted"
+    :type scheduling: str
+    :param weights: responses per turn of each priority for "weighted",
+        1 by default
+    :type weights: dict
+    :param priority: priority of paths without one
+    :type priority: int
+    :param lane_size: responses a lane holds before its stream waits
+    :type lane_size: int
+    """
+
+    def __init__(self, session, paths: list, options: SubscribeOptions = {},
+                 scheduling: str = "strict",
+                 weights: Optional[Dict[int, int]] = None,
+                 priority: int = 0, lane_size: int = DEFAULT_LANE_SIZE):
+        if scheduling not in SCHEDULING:
+            raise ValueError("Invalid scheduling: %s" % scheduling)
+
+        self.session = session
+        self.options = options
+        self.scheduling = scheduling
+        self.lane_size = lane_size
+
+        self._paths: Dict[int, list] = collections.defaultdict(list)
+        for entry in paths:
+            _, sub_options = split_entry(entry)
+            self._paths[sub_options.get("priority", priority)].append(entry)
+
+        weights = weights or {}
+        self._lanes = [_Lane(p, max(int(weights.get(p, 1)), 1))
+                       for p in sorted(self._paths)]
+        self._cond = threading.Condition()
+        self._calls: list = []
+        self._error = None
+        self._closed = False
+
+    @property
+    def delivered(self) -> Dict[int, int]:
+        """Responses handed to the consumer per priority"""
+        return {lane.priority: lane.delivered for lane in self._lanes}
+
+    @property
+    def waiting(self) -> Dict[int, int]:
+        """Responses queued per priority"""
+        with self._cond:
+            return {lane.priority: len(lane.items) for lane in self._lanes}
+
+    def _start(self, lane: _Lane):
+        prepared = self.session.prepare_subscribe(self._paths[lane.priority],
+                                                  self.options)
+        call = self.session.open_stream(prepared)
+        self._calls.append(call)
+
+        def read():
+            try:
+                for response in call:
+                    if not response.HasField("update"):
+                        continue
+                    with self._cond:
+                        while len(lane.items) >= self.lane_size and \
+                                not self._closed:
+                            self._cond.wait()
+                        if self._closed:
+                            return
+                        lane.items.append(response)
+                        self._cond.notify_all()
+            except grpc.RpcError as rpcerr:
+                with self._cond:
+                    if not self._closed and self._error is None:
+                        self._error = rpcerr
+            finally:
+                with self._cond:
+                    lane.running = False
+                    self._cond.notify_all()
+
+        threading.Thread(target=read, daemon=True).start()
+
+    def _next(self):
+        # pick the lane to serve, `None` once every lane is finished
+        turn = 0
+        lane_index = 0
+        while True:
+            with self._cond:
+                while not any(lane.items for lane in self._lanes):
+                    if self._error is not None:
+                        break
+                    if not any(lane.running for lane in self._lanes):
+                        return
+                    self._cond.wait()
+                # a failed stream ends the subscription right away
+                if self._error is not None:
+                    raise GrpcError(Status_.from_call(self._error))
+
+                if self.scheduling == "strict":
+                    lane = next(lane for lane in self._lanes if lane.items)
+                else:
+                    lane = self._lanes[lane_index]
+                    if not lane.items or turn >= lane.weight:
+                        lane_index = (lane_index + 1) % len(self._lanes)
+                        turn = 0
+                        continue
+                    turn += 1
+
+                response = lane.items.popleft()
+                lane.delivered += 1
+                self._cond.notify_all()
+
+            yield response
+
+    def __iter__(self) -> Iterator[SubscribeResponse_]:
+        for lane in self._lanes:
+            self._start(lane)
+
+        try:
+            for response in self._next():
+                yield SubscribeResponse_(response)
+        finally:
+            self.close()
+
+    def close(self):
+        """Cancel the streams of every lane"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for call in self._calls:
+            call.cancel()
@@ -11,11 +11,12 @@ gNMI messags wrappers
 
 import re
 import collections
+import decimal
 import json
 import sys
 
 from abc import ABCMeta, abstractmethod
-from typing import List, Tuple, Any
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import google.protobuf as _
 import grpc
@@ -68,45 +69,172 @@ def extract_value_v3(value):
     return val
 
 
+def _extract_leaflist(value):
+    return [extract_value_v4(elem) for elem in value.element]
+
+
+# TypedValue oneof field -> decoder, fields missing here are returned as is
+_VALUE_DECODERS = {
+    "json_ietf_val": lambda value: json.loads(decode_bytes(value)),
+    "json_val": lambda value: json.loads(decode_bytes(value)),
+    "leaflist_val": _extract_leaflist,
+}
+
+
 def extract_value_v4(value):
-    val = None
-    if value.HasField("any_val"):
-        val = value.any_val
-    elif value.HasField("ascii_val"):
-        val = value.ascii_val
-    elif value.HasField("bool_val"):
-        val = value.bool_val
-    elif value.HasField("bytes_val"):
-        val = value.bytes_val
-    elif value.HasField("decimal_val"):
-        val = value.decimal_val
-    elif value.HasField("float_val"):
-        val = value.float_val
-    elif value.HasField("int_val"):
-        val = value.int_val
-    elif value.HasField("json_ietf_val"):
-        val = json.loads(decode_bytes(value.json_ietf_val))
-    elif value.HasField("json_val"):
-        val = json.loads(decode_bytes(value.json_val))
-    elif value.HasField("leaflist_val"):
-        lst = []
-        for elem in value.leaflist_val.element:
-            lst.append(extract_value_v4(elem))
-        val = lst
-    elif value.HasField("proto_bytes"):
-        val = value.proto_bytes
-    elif value.HasField("string_val"):
-        val = value.string_val
-    elif value.HasField("uint_val"):
-        val = value.uint_val
-    else:
+    # a single oneof lookup rather than testing every field in turn
+    field = value.WhichOneof("value")
+    if field is None:
         raise ValueError("Unhandled type of value %s" % str(value))
 
+    val = getattr(value, field)
+    decoder = _VALUE_DECODERS.get(field)
+    if decoder is not None:
+        val = decoder(val)
+
     return val
 
-def _cast_gnmi_type(value, gnmi_type):
-    pass
-    
+def _to_uint(value):
+    value = int(value)
+    if value < 0:
+        raise ValueError("Invalid uint value: %d" % value)
+    return value
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return value.encode()
+    return bytes(value)
+
+
+def _to_decimal64(value):
+    if not isinstance(value, decimal.Decimal):
+        # via str() so that 0.1 is 1/10 rather than its binary expansion
+        value = decimal.Decimal(str(value))
+    precision = max(0, -value.as_tuple().exponent)
+    return pb.Decimal64(digits=int(value.scaleb(precision)),
+                        precision=precision)
+
+
+TYPED_VALUE_MAP: Dict[type, str] = {
+    bool: 'bool_val',
+    bytes: 'bytes_val',
+    decimal.Decimal: 'decimal_val',
+    dict: 'json_ietf_val',
+    int: 'int_val',
+    float: 'float_val',
+    list: 'leaflist_val',
+    str: 'string_val',
+    tuple: 'leaflist_val'
+}
+
+TYPE_HANDLER_MAP: Dict[str, Any] = {
+    'ascii_val': str,
+    'bool_val': lambda value: True if value else False,
+    'bytes_val': _to_bytes,
+    'decimal_val': _to_decimal64,
+    'float_val': float,
+    'int_val': int,
+    'json_ietf_val': lambda value: json.dumps(value).encode(),
+    'json_val': lambda value: json.dumps(value).encode(),
+    'string_val': str,
+    'uint_val': _to_uint
+}
+
+
+def _set_value(typed, value, type_: str = ""):
+    # fills `typed` in place, copying sub-messages is slow with the python
+    # protobuf implementation
+    if not type_:
+        type_ = TYPED_VALUE_MAP.get(type(value), "")
+        if not type_:
+            raise ValueError("Invalid type: %s for %s" %
+                             (type(value), str(value)))
+
+    if type_ == "leaflist_val":
+        typed.leaflist_val.SetInParent()
+        elements = typed.leaflist_val.element
+        for elem in value:
+            _set_value(elements.add(), elem)
+        return typed
+
+    handler = TYPE_HANDLER_MAP.get(type_)
+    if handler is None:
+        raise ValueError("Invalid TypedValue field: %s" % type_)
+
+    if type_ == "decimal_val":
+        typed.decimal_val.CopyFrom(handler(value))
+    else:
+        setattr(typed, type_, handler(value))
+    return typed
+
+
+def typed_value(value, type_: str = ""):
+    """Build a gnmi.TypedValue
+
+    Python types map to TypedValue fields as per `TYPED_VALUE_MAP`, lists
+    become leaf-lists.
+
+    :param value: python value
+    :param type_: TypedValue field to use, e.g. "uint_val", inferred from
+        the type of `value` when empty
+    :type type_: str
+    """
+    return _set_value(pb.TypedValue(), value, type_)
+
+
+def encode_updates(items: Iterable[tuple],
+                   cache: Optional[dict] = None) -> list:
+    """Build gnmi.Update messages from (path, value[, type]) items
+
+    Paths are parsed once per parent container: leaves of an already seen
+    parent only add their last element.  Pass the same `cache` to reuse
+    parsed parents across calls.
+
+    :param items: (path, value) or (path, value, type) tuples, see
+        `typed_value` for types
+    :type items: iterable
+    :param cache: parsed parent paths
+    :type cache: dict
+    :rtype: list of gnmi.Update
+    """
+    if cache is None:
+        cache = {}
+
+    updates = []
+    for item in items:
+        path, value = item[0], item[1]
+        type_ = item[2] if len(item) > 2 else ""
+
+        update = pb.Update()
+        if isinstance(path, Path_):
+            update.path.CopyFrom(path.raw)
+        else:
+            _set_path(update.path, path, cache)
+        _set_value(update.val, value, type_)
+        updates.append(update)
+
+    return updates
+
+
+def _set_path(raw, path: str, cache: dict):
+    parent, sep, leaf = path.rpartition("/")
+    # keyed or escaped leaves take the full parser
+    if not sep or not leaf or "[" in leaf or "\\" in path:
+        parsed = cache.get(path)
+        if parsed is None:
+            parsed = cache[path] = Path_.from_string(path).raw
+        raw.CopyFrom(parsed)
+        return
+
+    parsed = cache.get(parent)
+    if parsed is None:
+        parsed = cache[parent] = Path_.from_string(parent).raw
+    raw.origin = parsed.origin
+    raw.elem.extend(parsed.elem)
+    raw.elem.add(name=leaf)
+
+
 class BaseMessage(metaclass=ABCMeta):
 
     def __init__(self, message):
@@ -161,21 +289,9 @@ class Update_(BaseMessage):
 
     """
 
-    _TYPED_VALUE_MAP = {
-        bool: 'bool_val',
-        dict: 'json_ietf_val',
-        int: 'int_val',
-        float: 'float_val',
-        str: 'string_val'
-    }
-
-    _TYPE_HANDLER_MAP = {
-        'bool_val': lambda value: True if value else False,
-        'json_ietf_val': lambda value: json.dumps(value).encode(),
-        'int_val': int,
-        'float_val': float,
-        'string_val': str
-    }
+    _TYPED_VALUE_MAP = TYPED_VALUE_MAP
+
+    _TYPE_HANDLER_MAP = TYPE_HANDLER_MAP
     
     @property
     def path(self):
@@ -192,25 +308,17 @@ class Update_(BaseMessage):
 
     @classmethod
     def from_keyval(cls, keyval: Tuple[str, Any], forced_type: str = ""):
-        path, value = keyval
+        """Build an update from a (path, value) or (path, value, type) tuple
 
-        path = Path_.from_string(path)
-        typed_value = pb.TypedValue()
+        See `typed_value` for the supported types.
+        """
+        path, value = keyval[0], keyval[1]
+        if len(keyval) > 2 and not forced_type:
+            forced_type = keyval[2]
 
-        type_: str = forced_type
-        func = lambda v: v
-        
-        if forced_type:
-            func = cls._TYPE_HANDLER_MAP[forced_type]
-        else:
-            type_ = cls._TYPED_VALUE_MAP.get(type(value))
-            if not type_:
-                raise ValueError("Invalid type: %s for %s" % type(value), str(value))
-            func = cls._TYPE_HANDLER_MAP[type_]
-        
-        setattr(typed_value, type_, func(value))
+        path = Path_.from_string(path)
         
-        return cls(pb.Update(path=path.raw, val=typed_value))
+        return cls(pb.Update(path=path.raw, val=typed_value(value, forced_type)))
 
 
 class Notification_(IterableMessage):
@@ -412,6 +520,23 @@ class Path_(BaseMessage):
         
         return cls(pb.Path(origin=origin, elem=elems)) # type: ignore
 
+def parse_path(path) -> pb.Path:
+    """Return a gnmi.Path from a path string, a list of elements, `Path_`
+    or gnmi.Path, an empty or missing path is the root
+    """
+    if not path:
+        return Path_.from_string("").raw
+    if isinstance(path, Path_):
+        return path.raw
+    if isinstance(path, pb.Path):
+        return path
+    if isinstance(path, str):
+        return Path_.from_string(path).raw
+    if isinstance(path, (list, tuple)):
+        return Path_.from_string("/".join(path)).raw
+    raise ValueError("Failed to parse path: %s" % str(path))
+
+
 class Status_(collections.namedtuple('Status_', 
         ('code', 'details', 'trailing_metadata')), grpc.Status):
     
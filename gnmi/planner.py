@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.planner
+~~~~~~~~~~~~~~~~
+
+Remove redundant paths from subscription requests
+
+"""
+
+import collections
+
+from typing import List, Optional
+
+from gnmi.messages import Path_
+from gnmi.structures import SubscribeOptions
+
+# estimated updates per second of an on-change path, for stream balancing
+DEFAULT_ON_CHANGE_RATE = 0.1
+
+
+class Pruned(collections.namedtuple("Pruned", ("path", "covered_by"))):
+    r"""A path dropped from a subscription
+
+    :param path: the dropped entry, as given
+    :param covered_by: the kept entry that already subscribes to it
+    """
+
+    __slots__ = ()
+
+
+class PathPlan(collections.namedtuple("PathPlan", ("paths", "pruned"))):
+    r"""Result of `minimize`
+
+    :param paths: entries to subscribe to, in their original order
+    :param pruned: list of :class:`Pruned`
+    """
+
+    __slots__ = ()
+
+
+def split_entry(entry) -> tuple:
+    """(path, SubscriptionOptions) of a subscription entry, a path alone
+    comes with empty options
+    """
+    if isinstance(entry, tuple) and len(entry) == 2 and \
+            isinstance(entry[1], dict):
+        return entry
+    return entry, {}
+
+
+def _settings(sub_options: dict, options: SubscribeOptions) -> tuple:
+    # effective per-path options, paths only cover each other when equal,
+    # paths of different priorities are delivered through different lanes
+    return (
+        sub_options.get("submode") or options.get("submode") or "on-change",
+        sub_options.get("interval", options.get("interval")) or 0,
+        sub_options.get("heartbeat", options.get("heartbeat")) or 0,
+        bool(sub_options.get("suppress", options.get("suppress", False))),
+        sub_options.get("priority", options.get("priority")) or 0,
+        sub_options.get("rate"),
+    )
+
+
+def path_elems(path) -> tuple:
+    """(origin, ((name, keys), ...)) of a path as taken by `covers`"""
+    if isinstance(path, str):
+        path = Path_.from_string(path)
+    elif isinstance(path, (list, tuple)):
+        path = Path_.from_string("/".join(path))
+    elif not isinstance(path, Path_):
+        path = Path_(path)
+    return path.origin, tuple((e.name, dict(e.raw.key)) for e in path.elements)
+
+
+def _elem_covers(elem, other) -> bool:
+    name, keys = elem
+    other_name, other_keys = other
+    if name not in ("*", other_name):
+        return False
+    # a key missing from `other` addresses every list entry
+    for key, value in keys.items():
+        if key not in other_keys or value not in ("*", other_keys[key]):
+            return False
+    return True
+
+
+def covers(path: tuple, other: tuple) -> bool:
+    """Whether the elements of `path` match `other` or one of its ancestors
+
+    "*" matches any element name or key value, "..." any number of
+    elements.
+    """
+    if not path:
+        return True
+    if path[0][0] == "...":
+        return any(covers(path[1:], other[pos:])
+                   for pos in range(len(other) + 1))
+    if not other or not _elem_covers(path[0], other[0]):
+        return False
+    return covers(path[1:], other[1:])
+
+
+def minimize(paths: list, options: Optional[SubscribeOptions] = None
+             ) -> PathPlan:
+    r"""Drop entries already subscribed to by another entry with the same
+    options
+
+    Entries are paths or (path, SubscriptionOptions) tuples as taken by
+    `Session.subscribe`.  An entry is dropped when an ancestor, a wildcard
+    path or a duplicate covers it.  Of duplicates the first one is kept.
+    The priority and rate of an entry count as options, entries of another
+    priority are delivered through their own lane, see
+    `gnmi.lanes.PrioritySubscription`.
+
+    Usage::
+
+        In [1]: from gnmi.planner import minimize
+        In [2]: plan = minimize(["/interfaces/interface[name=*]/state",
+           ...:                  "/interfaces/interface[name=Ethernet1]/state",
+           ...:                  "/system"])
+        In [3]: plan.paths
+        Out[3]: ['/interfaces/interface[name=*]/state', '/system']
+        In [4]: plan.pruned
+        Out[4]: [Pruned(path='/interfaces/interface[name=Ethernet1]/state',
+           ...:        covered_by='/interfaces/interface[name=*]/state')]
+
+    :param paths: subscription entries
+    :type paths: list
+    :param options: subscription wide options the entries default to
+    :type options: gnmi.structures.SubscribeOptions
+    :rtype: gnmi.planner.PathPlan
+    """
+    options = options or {}
+
+    parsed = []
+    for entry in paths:
+        path, sub_options = split_entry(entry)
+        origin, elems = path_elems(path)
+        parsed.append(((origin, _settings(sub_options, options)), elems))
+
+    # a covering path sorts before the paths it covers: it is shorter, or
+    # has fewer keys, or more wildcards.  The sort is stable so of
+    # duplicates the first one is kept.
+    def breadth(i):
+        elems = parsed[i][1]
+        names = [name for name, _ in elems]
+        values = [v for _, keys in elems for v in keys.values()]
+        return (len(elems) - names.count("..."),
+                len(values),
+                -names.count("*") - values.count("*"))
+
+    order = sorted(range(len(paths)), key=breadth)
+    kept: dict = collections.defaultdict(list)
+    covered_by = {}
+
+    for i in order:
+        group, elems = parsed[i]
+        for j in kept[group]:
+            if covers(parsed[j][1], elems):
+                covered_by[i] = j
+                break
+        else:
+            kept[group].append(i)
+
+    pruned: List[Pruned] = []
+    result = []
+    for i, entry in enumerate(paths):
+        if i in covered_by:
+            pruned.append(Pruned(entry, paths[covered_by[i]]))
+        else:
+            result.append(entry)
+
+    return PathPlan(result, pruned)
+
+
+def estimate_rate(entry, options: Optional[SubscribeOptions] = None
+                  ) -> float:
+    """Estimated updates per second of a subscription entry
+
+    The `rate` of the entry's options when given, otherwise 1/interval for
+    samples and `DEFAULT_ON_CHANGE_RATE` for on-change.
+    """
+    options = options or {}
+    _, sub_options = split_entry(entry)
+    if sub_options.get("rate") is not None:
+        return sub_options["rate"]
+    if options.get("mode", "stream") != "stream":
+        return 1.0
+
+    submode = sub_options.get("submode") or options.get("submode") or \
+        "on-change"
+    interval = sub_options.get("interval", options.get("interval"))
+    if submode == "sample":
+        # 0 leaves the interval to the target, assume one per second
+        return 1e9 / interval if interval else 1.0
+    return DEFAULT_ON_CHANGE_RATE
+
+
+def balance(paths: list, count: int,
+            options: Optional[SubscribeOptions] = None) -> list:
+    r"""Spread subscription entries over `count` shards of about equal
+    estimated rate, see `estimate_rate`
+
+    The heaviest entries go first, each onto the lightest shard.
+
+    Usage::
+
+        In [1]: from gnmi.planner import balance
+        In [2]: balance([("/interfaces", {"submode": "sample",
+           ...:                           "interval": 10**9}),
+           ...:          "/system", "/lldp"], 2)
+        Out[2]: [[('/interfaces', {...})], ['/system', '/lldp']]
+
+    :param paths: subscription entries
+    :type paths: list
+    :param count: number of shards
+    :type count: int
+    :param options: subscription wide options the entries default to
+    :type options: gnmi.structures.SubscribeOptions
+    :rtype: list of lists of entries
+    """
+    options = options or {}
+    shards: list = [[] for _ in range(min(count, len(paths)) or 1)]
+    loads = [0.0] * len(shards)
+    for entry in sorted(paths, key=lambda e: estimate_rate(e, options),
+                        reverse=True):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(entry)
+        loads[lightest] += estimate_rate(entry, options)
+    return shards
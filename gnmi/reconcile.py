@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.reconcile
+~~~~~~~~~~~~~~~~
+
+Push desired state as the minimal set of updates and deletes
+
+Both desired and current state are flattened into leaves.  Without a schema
+list keys are unknown, so JSON lists are compared as whole leaf values.
+
+"""
+
+import collections
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from gnmi.batch import SetBatch
+from gnmi.messages import Path_, SetResponse_, Update_, escape_string
+from gnmi.structures import GetOptions
+
+Leaves = Dict[Tuple[str, ...], object]
+
+
+class Plan(collections.namedtuple("Plan", ("deletes", "updates", "response"))):
+    r"""Operations needed to reach the desired state
+
+    :param deletes: paths to delete
+    :param updates: (path, value) leaves to update
+    :param response: the SetResponse_ once applied, `None` on a dry run
+    """
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return bool(self.deletes or self.updates)
+
+
+def _elems(path) -> Tuple[str, ...]:
+    if isinstance(path, str):
+        path = Path_.from_string(path)
+    elems = []
+    for elem in path.elements:
+        keys = "".join("[%s=%s]" % (k, escape_string(v, "]"))
+                       for k, v in sorted(elem.key.items()))
+        elems.append(escape_string(elem.name, "/") + keys)
+    return tuple(elems)
+
+
+def _to_string(elems: Tuple[str, ...]) -> str:
+    return "/" + "/".join(elems)
+
+
+def flatten(value, base: Tuple[str, ...] = (), leaves: Optional[Leaves] = None
+            ) -> Leaves:
+    """Flatten a JSON tree into {path elements: value} leaves
+
+    Module prefixes of JSON-IETF member names are dropped.
+    """
+    if leaves is None:
+        leaves = {}
+
+    if isinstance(value, dict):
+        for name, child in value.items():
+            flatten(child, base + (name.split(":")[-1],), leaves)
+    else:
+        leaves[base] = value
+
+    return leaves
+
+
+def _equal(current, desired) -> bool:
+    if current == desired:
+        return True
+    # JSON-IETF encodes 64-bit integers and decimals as strings
+    if isinstance(current, str) != isinstance(desired, str) and \
+            not isinstance(current, (bool, dict, list)) and \
+            not isinstance(desired, (bool, dict, list)):
+        return str(current) == str(desired)
+    return False
+
+
+class Reconciler(object):
+    r"""Computes and applies the difference between desired and current
+    state below a prefix
+
+    Usage::
+
+        In [1]: from gnmi.reconcile import Reconciler
+        In [2]: rec = Reconciler(sess, "/system/config")
+        In [3]: plan = rec.reconcile({"hostname": "veos3",
+           ...:                       "domain-name": "lab"}, dry_run=True)
+        In [4]: plan.updates
+        Out[4]: [('/system/config/domain-name', 'lab')]
+
+    :param session: session to the target
+    :type session: gnmi.session.Session
+    :param prefix: root of the managed subtree
+    :type prefix: str
+    :param prune: delete current leaves missing from the desired state
+    :type prune: bool
+    :param options: options for fetching current state
+    :type options: gnmi.structures.GetOptions
+    """
+
+    def __init__(self, session, prefix: str = "/", prune: bool = True,
+                 options: GetOptions = {"type": "config"}):
+        self.session = session
+        self.prefix = Path_.from_string(prefix).to_string() or "/"
+        self.prune = prune
+        self.options = options
+        self._base = _elems(self.prefix)
+
+    def current(self) -> Leaves:
+        """Fetch and flatten the current state under the prefix"""
+        leaves: Leaves = {}
+        for notif in self.session.get([self.prefix], self.options):
+            prefix = _elems(notif.prefix)
+            for update in notif.updates:
+                flatten(update.value, prefix + _elems(update.path), leaves)
+        return leaves
+
+    def desired(self, state: Union[dict, Iterable[tuple]]) -> Leaves:
+        """Flatten a JSON tree, or (path, value) leaves, relative to the
+        prefix
+        """
+        if isinstance(state, dict):
+            return flatten(state, self._base)
+
+        leaves: Leaves = {}
+        for path, value in state:
+            flatten(value, self._base + _elems(path), leaves)
+        return leaves
+
+    def diff(self, current: Leaves, desired: Leaves) -> Plan:
+        """Compare flattened states
+
+        Deleted leaves are collapsed into the highest container below the
+        prefix that holds no desired leaves.
+        """
+        updates = []
+        for path, value in desired.items():
+            if path not in current or not _equal(current[path], value):
+                updates.append((_to_string(path), value))
+
+        deletes: List[str] = []
+        if self.prune:
+            # containers holding a desired leaf must not be deleted
+            keep = set()
+            for path in desired:
+                for depth in range(len(self._base) + 1, len(path) + 1):
+                    keep.add(path[:depth])
+
+            seen = set()
+            for path in current:
+                if path in desired:
+                    continue
+                container = path
+                for depth in range(len(self._base) + 1, len(path) + 1):
+                    container = path[:depth]
+                    if container not in keep:
+                        break
+                if container not in seen:
+                    seen.add(container)
+                    deletes.append(_to_string(container))
+
+        return Plan(deletes, updates, None)
+
+    def plan(self, state: Union[dict, Iterable[tuple]]) -> Plan:
+        """Return the operations needed to reach `state`"""
+        return self.diff(self.current(), self.desired(state))
+
+    def apply(self, plan: Plan) -> Plan:
+        """Send a plan, nothing is sent when it is empty"""
+        if not plan:
+            return plan
+
+        batch = SetBatch()
+        for path in plan.deletes:
+            batch.delete(path)
+        for path, value in plan.updates:
+            if isinstance(value, list):
+                batch.update(Update_.from_keyval((path, value),
+                                                 forced_type="json_ietf_val"))
+            else:
+                batch.update((path, value))
+
+        response: SetResponse_ = self.session.set_batch(batch)
+        return plan._replace(response=response)
+
+    def reconcile(self, state: Union[dict, Iterable[tuple]],
+                  dry_run: bool = False) -> Plan:
+        """Plan and, unless `dry_run`, apply the changes to reach `state`"""
+        plan = self.plan(state)
+        if dry_run:
+            return plan
+        return self.apply(plan)
@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.recorder
+~~~~~~~~~~~~~~~~
+
+Append-only binary log of subscription traffic
+
+A recording is a directory of segment files.  Each segment starts with a
+short magic header followed by independently compressed blocks::
+
+    <codec: u8><stored length: u32><raw length: u32><block data>
+
+Block data holds length-delimited records, compressed with `zlib` or, when
+the ``zstandard`` package is installed, `zstd`::
+
+    <payload length: u32><receive time ns: u64><target length: u16>
+    <target: utf-8><payload: serialized gnmi.SubscribeResponse>
+
+Records are buffered into blocks of ``block_size`` bytes and segments are
+rotated once they grow past ``segment_size`` bytes.  Unless disabled, each
+segment gets a sidecar time and path index (see :mod:`gnmi.index`) built as
+blocks are written.  The index doubles as the block table, queries only
+decompress the blocks it points at.
+
+"""
+
+import collections
+import contextlib
+import mmap
+import os
+import struct
+import zlib
+
+from typing import Iterator, List, Optional, Union
+
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.index import IndexWriter, SegmentIndex
+from gnmi.index import index_file, response_matches
+from gnmi.messages import Path_, SubscribeResponse_
+from gnmi import util
+
+MAGIC = b"GNMIREC\x02"
+SEGMENT_SUFFIX = ".seg"
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+CODECS = [None, "zlib", "zstd"]
+
+_HEADER = struct.Struct("<IQH")
+_FRAME = struct.Struct("<BII")
+
+
+def _compressor(compression: Optional[str], level: Optional[int] = None):
+    if compression not in CODECS:
+        raise ValueError("Unknown compression: %s" % compression)
+    if compression == "zlib":
+        level = 1 if level is None else level
+        return lambda data: zlib.compress(data, level)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        cctx = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return cctx.compress
+    return bytes
+
+
+def _decompress(codec: int, data, size: int) -> bytes:
+    if codec == 1:
+        return zlib.decompress(data, bufsize=size)
+    if codec == 2:
+        if zstandard is None:
+            raise ValueError("zstd block found, zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data,
+                                                       max_output_size=size)
+    if codec == 0:
+        return bytes(data)
+    raise ValueError("Unknown block codec: %d" % codec)
+
+
+def encode_block(records: bytes, compression: Optional[str] = "zlib",
+                 level: Optional[int] = None) -> bytes:
+    """Frame packed records as a block"""
+    data = _compressor(compression, level)(records)
+    codec = CODECS.index(compression)
+    return _FRAME.pack(codec, len(data), len(records)) + data
+
+
+class Record(collections.namedtuple("Record", ("timestamp", "target", "data"))):
+    r"""A recorded response
+
+    The payload is only decoded when `response` is accessed, so scanning a
+    recording by time or target does not pay for protobuf parsing.
+    """
+
+    __slots__ = ()
+
+    @property
+    def response(self) -> SubscribeResponse_:
+        return SubscribeResponse_(pb.SubscribeResponse.FromString(self.data))
+
+
+def segment_name(sequence: int) -> str:
+    return "%08d%s" % (sequence, SEGMENT_SUFFIX)
+
+
+def pack_record(timestamp: int, target: str, data: bytes) -> bytes:
+    """Frame a serialized gnmi.SubscribeResponse as a record"""
+    target_ = target.encode()
+    return _HEADER.pack(len(data), timestamp, len(target_)) + target_ + data
+
+
+def list_segments(directory: str) -> List[str]:
+    """Return the segment files in `directory` in recording order"""
+    names = [n for n in os.listdir(directory) if n.endswith(SEGMENT_SUFFIX)]
+    return [os.path.join(directory, n) for n in sorted(names)]
+
+
+class Recorder(object):
+    r"""Writes subscribe responses to a segmented binary log
+
+    Usage::
+
+        In [1]: from gnmi.recorder import Recorder
+        In [2]: with Recorder("/var/tmp/capture", target=sess.hostaddr) as rec:
+           ...:     for resp in rec.record(sess.subscribe(paths)):
+           ...:         pass
+
+    :param directory: recording directory, created if missing
+    :type directory: str
+    :param target: default target recorded with each response
+    :type target: str
+    :param compression: block codec, one of `None`, "zlib" or "zstd"
+    :type compression: str
+    :param level: compression level (default: codec specific, fast)
+    :type level: int
+    """
+
+    def __init__(self,
+                 directory: str,
+                 target: str = "",
+                 segment_size: int = DEFAULT_SEGMENT_SIZE,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 index: bool = True,
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 compression: Optional[str] = "zlib",
+                 level: Optional[int] = None):
+
+        self.directory = directory
+        self.target = target
+        self.segment_size = segment_size
+        self.block_size = block_size
+        self.compression = compression
+        self._compress = _compressor(compression, level)
+        self._codec = CODECS.index(compression)
+        self._buffer_size = buffer_size
+        self._indexed = index
+        self._index: Optional[IndexWriter] = None
+        self._targets: dict = {}
+        self._block = bytearray()
+
+        os.makedirs(directory, exist_ok=True)
+
+        # never append to an existing segment, start a new one after it
+        self._sequence = 0
+        segments = list_segments(directory)
+        if segments:
+            name = os.path.basename(segments[-1])
+            self._sequence = int(name[:-len(SEGMENT_SUFFIX)]) + 1
+
+        self._fh = None
+        self._size = 0
+        self._open_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def segment(self) -> str:
+        """Path of the segment currently being written"""
+        return os.path.join(self.directory, segment_name(self._sequence))
+
+    def _open_segment(self):
+        self._fh = open(self.segment, "wb", buffering=self._buffer_size)
+        self._fh.write(MAGIC)
+        self._size = len(MAGIC)
+        if self._indexed:
+            self._index = IndexWriter(index_file(self.segment))
+
+    def _close_segment(self):
+        self._write_block()
+        self._fh.close()
+        if self._index:
+            self._index.close()
+
+    def _rotate(self):
+        self._close_segment()
+        self._sequence += 1
+        self._open_segment()
+
+    def _write_block(self):
+        if not self._block:
+            return
+
+        data = self._compress(self._block)
+        offset = self._size
+        self._fh.write(_FRAME.pack(self._codec, len(data), len(self._block)))
+        self._fh.write(data)
+        self._size += _FRAME.size + len(data)
+        self._block = bytearray()
+
+        if self._index:
+            # data must hit the segment before the index points at it
+            self._fh.flush()
+            self._index.close_block(offset, self._size)
+
+    def _encode_target(self, target: str) -> bytes:
+        encoded = self._targets.get(target)
+        if encoded is None:
+            encoded = self._targets[target] = target.encode()
+        return encoded
+
+    def write(self, response, target: Optional[str] = None,
+              timestamp: Optional[int] = None):
+        """Append a response to the log
+
+        :param response: response to record
+        :type response: gnmi.messages.SubscribeResponse_, gnmi.SubscribeResponse
+            or its serialized bytes
+        :param target: target the response came from (default: recorder target)
+        :type target: str
+        :param timestamp: receive time in nanoseconds (default: now)
+        :type timestamp: int
+        """
+        if isinstance(response, SubscribeResponse_):
+            response = response.raw
+        if not isinstance(response, bytes):
+            response = response.SerializeToString()
+
+        if timestamp is None:
+            timestamp = util.timestamp_ns()
+
+        target_ = self._encode_target(self.target if target is None else target)
+
+        block = self._block
+        block += _HEADER.pack(len(response), timestamp, len(target_))
+        block += target_
+        block += response
+
+        if self._index:
+            self._index.add(timestamp, response)
+
+        if len(block) >= self.block_size:
+            self._write_block()
+            if self._size >= self.segment_size:
+                self._rotate()
+
+    def record(self, responses: Iterator[SubscribeResponse_],
+               target: Optional[str] = None) -> Iterator[SubscribeResponse_]:
+        """Record `responses` while passing them through to the caller"""
+        for response in responses:
+            self.write(response, target)
+            yield response
+
+    def flush(self):
+        """Write out the pending block, making it visible to readers"""
+        self._write_block()
+        self._fh.flush()
+
+    def close(self):
+        if self._fh and not self._fh.closed:
+            self._close_segment()
+
+
+class Reader(object):
+    r"""Reads records from a recording directory
+
+    Segments are memory-mapped and decompressed one block at a time, so
+    iterating never loads a whole segment into memory.
+
+    Usage::
+
+        In [1]: from gnmi.recorder import Reader
+        In [2]: for record in Reader("/var/tmp/capture"):
+           ...:     print(record.timestamp, record.target)
+           ...:     for update in record.response.update:
+           ...:         print(update.path, update.value)
+
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def __iter__(self) -> Iterator[Record]:
+        for segment in self.segments:
+            yield from self.read_segment(segment)
+
+    @property
+    def segments(self) -> List[str]:
+        return list_segments(self.directory)
+
+    def read_segment(self, segment: str) -> Iterator[Record]:
+        """Yield the records of a single segment file"""
+        with self._map(segment) as mm:
+            for block in self._iter_blocks(mm, len(MAGIC), len(mm)):
+                yield from self._iter_records(block)
+
+    def blocks(self, segment: str) -> Iterator[tuple]:
+        """Yield (offset, end, stored size, raw size) of each block in
+        `segment` without decompressing them
+        """
+        with self._map(segment) as mm:
+            offset = len(MAGIC)
+            while offset + _FRAME.size <= len(mm):
+                _, stored, raw = _FRAME.unpack_from(mm, offset)
+                end = offset + _FRAME.size + stored
+                if end > len(mm):
+                    break
+                yield offset, end, stored, raw
+                offset = end
+
+    def query(self, path: Union[str, List[str], None] = None,
+              start: Optional[int] = None,
+              end: Optional[int] = None) -> Iterator[Record]:
+        r"""Yield records received in [start, end) that touch `path`
+
+        Blocks are located through the segment indexes so only the matching
+        blocks are decompressed.  Segments, or trailing blocks, without an
+        index are scanned.
+
+        Usage::
+
+            In [3]: records = reader.query(
+               ...:     "/interfaces/interface[name=Ethernet1]",
+               ...:     start=1588000000000000000, end=1588000300000000000)
+
+        :param path: path or subtree, or a list of them, `None` matches every
+            path
+        :type path: str or list
+        :param start: receive time in nanoseconds (inclusive)
+        :type start: int
+        :param end: receive time in nanoseconds (exclusive)
+        :type end: int
+        """
+        paths = None
+        if path is not None:
+            if isinstance(path, str):
+                path = [path]
+            paths = [Path_.from_string(p).to_string() for p in path]
+
+        for segment in self.segments:
+            index = SegmentIndex()
+            if os.path.exists(index_file(segment)):
+                index = SegmentIndex.load(index_file(segment))
+
+            ids = None
+            if paths is not None:
+                ids = set().union(*(index.match(p) for p in paths))
+            names: dict = {}
+
+            with self._map(segment) as mm:
+                ranges = [(b.offset, b.end)
+                          for b in index.search(start, end, ids)]
+                ranges.append((index.end or len(MAGIC), len(mm)))
+
+                for offset, stop in ranges:
+                    for block in self._iter_blocks(mm, offset, stop):
+                        yield from self._filter(self._iter_records(block),
+                                                paths, start, end, names)
+
+    def _filter(self, records: Iterator[Record], paths: Optional[List[str]],
+                start: Optional[int], end: Optional[int],
+                names: dict) -> Iterator[Record]:
+        for record in records:
+            if start is not None and record.timestamp < start:
+                continue
+            if end is not None and record.timestamp >= end:
+                continue
+            if paths is not None and not any(
+                    response_matches(record.data, p, names) for p in paths):
+                continue
+            yield record
+
+    @contextlib.contextmanager
+    def _map(self, segment: str):
+        with open(segment, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size <= len(MAGIC):
+                yield b""
+                return
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(MAGIC)] != MAGIC:
+                    raise ValueError("Not a recording segment: %s" % segment)
+                yield mm
+
+    def _iter_blocks(self, mm, offset: int, end: int) -> Iterator[bytes]:
+        while offset + _FRAME.size <= end:
+            codec, stored, raw = _FRAME.unpack_from(mm, offset)
+            start = offset + _FRAME.size
+            stop = start + stored
+
+            # a partially written block at the tail of a live segment
+            if stop > end:
+                break
+
+            yield _decompress(codec, mm[start:stop], raw)
+            offset = stop
+
+    def _iter_records(self, block: bytes) -> Iterator[Record]:
+        targets: dict = {}
+        unpack_from = _HEADER.unpack_from
+        header_size = _HEADER.size
+        offset = 0
+        end = len(block)
+
+        while offset + header_size <= end:
+            length, timestamp, tlen = unpack_from(block, offset)
+            start = offset + header_size + tlen
+            stop = start + length
+
+            tbytes = block[offset + header_size:start]
+            target = targets.get(tbytes)
+            if target is None:
+                target = targets[tbytes] = tbytes.decode()
+
+            yield Record(timestamp, target, block[start:stop])
+            offset = stop
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.replay
+~~~~~~~~~~~~~~~~
+
+Replay recordings through the Session subscribe interface
+
+"""
+
+import time
+
+from typing import Iterator, Optional
+
+import grpc
+
+from gnmi.messages import Path_, Status_, SubscribeResponse_
+from gnmi.messages import parse_path
+from gnmi.planner import split_entry
+from gnmi.recorder import Reader
+from gnmi.structures import SubscribeOptions
+from gnmi.util import join_paths
+from gnmi.exceptions import GrpcDeadlineExceeded
+
+
+class ReplaySession(object):
+    r"""Stands in for a :class:`gnmi.session.Session` and replays a
+    recording from its `subscribe` method
+
+    Usage::
+
+        In [1]: from gnmi.replay import ReplaySession
+        In [2]: sess = ReplaySession("/var/tmp/capture", target="veos3:6030",
+           ...:     speed=10)
+        In [3]: for resp in sess.subscribe(["/interfaces"]):
+           ...:     prefix = resp.update.prefix
+           ...:     for update in resp.update.updates:
+           ...:         print(str(prefix + update.path), update.value)
+
+    :param directory: recording directory
+    :type directory: str
+    :param target: only replay responses recorded from this target
+    :type target: str
+    :param speed: replay speed multiplier for the recorded inter-arrival
+        gaps, `None` replays as fast as possible
+    :type speed: float
+    :param start: receive time in nanoseconds to start from
+    :type start: int
+    :param end: receive time in nanoseconds to stop at (exclusive)
+    :type end: int
+    """
+
+    def __init__(self,
+                 directory: str,
+                 target: Optional[str] = None,
+                 speed: Optional[float] = 1.0,
+                 start: Optional[int] = None,
+                 end: Optional[int] = None):
+
+        if speed is not None and speed <= 0:
+            raise ValueError("Invalid replay speed: %s" % speed)
+
+        self.directory = directory
+        self.target = target
+        self.speed = speed
+        self.start = start
+        self.end = end
+        self._reader = Reader(directory)
+
+    def subscribe(self, paths: Optional[list] = None,
+                  options: SubscribeOptions = {}
+                  ) -> Iterator[SubscribeResponse_]:
+        r"""Replay recorded responses touching `paths`
+
+        Only the `prefix` and `timeout` options apply, the rest describe the
+        original subscription and are ignored.
+
+        :param paths: List of paths, `None` replays everything
+        :type paths: list
+        :param options:
+        :type options: gnmi.structures.SubscribeOptions
+        :rtype: gnmi.messages.SubscribeResponse_
+        """
+        query = None
+        if paths:
+            prefix = parse_path(options.get("prefix"))
+            query = []
+            for entry in paths:
+                # per-path subscription options do not apply
+                path, _ = split_entry(entry)
+                path = join_paths(prefix, parse_path(path))
+                query.append(Path_(path).to_string())
+
+        timeout = options.get("timeout")
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        first = None
+
+        for record in self._reader.query(query, self.start, self.end):
+            if self.target is not None and record.target != self.target:
+                continue
+
+            now = time.monotonic()
+            if self.speed is not None:
+                if first is None:
+                    first = record.timestamp
+                due = started + (record.timestamp - first) / 1e9 / self.speed
+                if deadline is not None and due > deadline:
+                    time.sleep(max(deadline - now, 0))
+                    now = deadline
+                elif due > now:
+                    time.sleep(due - now)
+                    now = due
+
+            if deadline is not None and now >= deadline:
+                raise GrpcDeadlineExceeded(Status_(
+                    grpc.StatusCode.DEADLINE_EXCEEDED, "Deadline Exceeded",
+                    None))
+
+            response = record.response
+            if response.raw.HasField("update"):
+                yield response
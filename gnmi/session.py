@@ -16,17 +16,72 @@ from gnmi.proto import gnmi_pb2_grpc  # type: ignore
 
 from typing import Optional, Iterator
 
+import collections
+import queue
 import ssl
+import threading
 
 from gnmi import util
+from gnmi.batch import SetBatch, coalesce
+from gnmi.cache import GetCache
+from gnmi.capabilities import CapabilitiesCache
 from gnmi.messages import CapabilitiesResponse_, GetResponse_, Path_, Status_
-from gnmi.messages import Update_
+from gnmi.messages import Notification_, Update_, parse_path
 from gnmi.messages import SubscribeResponse_, SetResponse_
-from gnmi.structures import Metadata, Target, CertificateStore, Options
-from gnmi.structures import GetOptions, GrpcOptions, SubscribeOptions
+from gnmi.planner import balance, minimize, split_entry
+from gnmi.structures import Metadata, Target, CertificateStore
+from gnmi.structures import GetOptions, GrpcOptions, SetOptions
+from gnmi.structures import SubscribeOptions
 from gnmi.constants import DEFAULT_GRPC_PORT, MODE_MAP, DATA_TYPE_MAP
+from gnmi.constants import ENCODING_PREFERENCE
 from gnmi.exceptions import GrpcError, GrpcDeadlineExceeded
 
+# responses buffered between the streams of a sharded subscription and the
+# consumer
+MERGE_QUEUE_SIZE = 1024
+
+
+class PreparedGet(collections.namedtuple("PreparedGet", (
+        "paths", "template", "shard_size", "adaptive", "requests",
+        "ttl"))):
+    r"""Get requests built by `Session.prepare_get`
+
+    Treat the messages as read-only, they are sent as they are by every
+    `Session.get` of the handle.
+
+    :param paths: parsed paths
+    :param template: GetRequest holding everything but the paths
+    :param shard_size: paths per request
+    :param adaptive: split paths that fail with RESOURCE_EXHAUSTED
+    :param requests: GetRequests, or their serialized bytes, to send
+    :param ttl: seconds to cache the notifications, `None` for the
+        cache's default
+    """
+
+    __slots__ = ()
+
+
+class PreparedSubscribe(collections.namedtuple("PreparedSubscribe",
+                                               ("request", "timeout",
+                                                "pruned"))):
+    r"""Subscribe request built by `Session.prepare_subscribe`
+
+    :param request: SubscribeRequest, or its serialized bytes, to send
+    :param timeout: RPC timeout in seconds
+    :param pruned: entries dropped by the `minimize` option, see
+        :class:`gnmi.planner.Pruned`
+    """
+
+    __slots__ = ()
+
+
+def _pick_encoding(response) -> str:
+    # first preferred encoding supported by a Capabilities response
+    for name in ENCODING_PREFERENCE:
+        if util.get_gnmi_constant(name) in response.supported_encodings:
+            return name
+    return "json"
+
 
 class Session(object):
     r"""Represents a gNMI session
@@ -39,14 +94,24 @@ class Session(object):
 
     """
 
+    # working Get partitions, keyed by (hostaddr, path), shared by sessions
+    _partitions: dict = {}
+
+    # encodings picked for "auto", keyed by hostaddr, shared by sessions
+    _encodings: dict = {}
+
     def __init__(self,
                  target: Target,
                  metadata: Metadata = [],
                  secure: bool = False,
                  certificates: CertificateStore = {},
-                 grpc_options: GrpcOptions = {}):
+                 grpc_options: GrpcOptions = {},
+                 cache: Optional[GetCache] = None,
+                 capabilities_cache: Optional[CapabilitiesCache] = None):
 
        
+        self.cache = cache
+        self.capabilities_cache = capabilities_cache
         self._certificates = certificates
         self._grpc_options = list(grpc_options.items())
         self._secure = secure
@@ -61,6 +126,10 @@ class Session(object):
     def hostaddr(self):
         return "%s:%d" % self.target
 
+    def close(self):
+        """Close the session channel"""
+        self._channel.close()
+
     def _new_channel(self):
         root_cert: bytes
         private_key: Optional[bytes]
@@ -95,23 +164,12 @@ class Session(object):
         
         return update.raw
     
-    def _parse_path(self, path):
-        if not path:
-            path = Path_.from_string(path)
-        elif isinstance(path, Path_):
-            path = path
-        elif isinstance(path, str):
-            path = Path_.from_string(path)
-        elif isinstance(path, (list, tuple)):
-            path = Path_.from_string("/".join(path))
-        else:
-            raise ValueError("Failed to parse path: %s" % str(path))
-        
-        return path.raw
-    
-    def capabilities(self) -> CapabilitiesResponse_:
+    def capabilities(self, refresh: bool = False) -> CapabilitiesResponse_:
         r"""Discover capabilities of the target
 
+        With a `capabilities_cache` the target is only asked when its entry
+        is missing or expired, or on `refresh`.
+
         Usage::
     
             In [3]: resp = sess.capabilities()
@@ -136,9 +194,17 @@ class Session(object):
             openconfig-bgp 6.0.0
             ...
         
+        :param refresh: bypass the capabilities cache
+        :type refresh: bool
         :rtype: gnmi.messages.CapabilitiesResponse_
         """
 
+        caps = self.capabilities_cache
+        if caps is not None and not refresh:
+            cached = caps.get(self.hostaddr)
+            if cached is not None:
+                return cached
+
         _cr = pb.CapabilityRequest()  # type: ignore
 
         try:
@@ -147,8 +213,27 @@ class Session(object):
             status = Status_.from_call(rpcerr)
             raise GrpcError(status)
 
+        if caps is not None and caps.put(self.hostaddr, response) and \
+                self.cache is not None:
+            # an upgraded target may serve different data
+            self.cache.invalidate(self.hostaddr)
+        self._encodings[self.hostaddr] = _pick_encoding(response)
+
         return CapabilitiesResponse_(response)
 
+    def _encoding(self, name: Optional[str]) -> int:
+        # gnmi.Encoding value of an encoding option
+        name = name or "json"
+        if name != "auto":
+            return util.get_gnmi_constant(name)
+
+        if self.hostaddr not in self._encodings:
+            # a cached Capabilities response is enough, the pick is
+            # remembered either way
+            caps = self.capabilities()
+            self._encodings[self.hostaddr] = _pick_encoding(caps.raw)
+        return util.get_gnmi_constant(self._encodings[self.hostaddr])
+
     def get(self, paths: list, options: GetOptions = {}) -> GetResponse_:
         r"""Get snapshot of state from the target
 
@@ -171,6 +256,36 @@ class Session(object):
             /system/memory/state/physical 2062848000
             /system/memory/state/reserved 2007666688
 
+        With the `shard_size` option, paths are split into shards of that
+        many paths that are requested concurrently over the session channel.
+        Notifications are returned in the order of `paths`.
+
+        When the session has a :class:`gnmi.cache.GetCache`, paths with a
+        live entry are served from it and only the rest are requested.  The
+        `ttl` option sets how long the fetched notifications are cached,
+        in seconds, instead of the cache's default.  A
+        :class:`PreparedGet` sends its prepared requests when no path was
+        served from the cache, partial hits build requests for the rest.
+
+        With the `adaptive` option, a path whose response is too large
+        (RESOURCE_EXHAUSTED) is retried as one Get per child container,
+        recursing as needed.  Children are discovered with `get_stream` and
+        the working split is remembered per target and path, so later calls
+        request the right granularity directly.  The discovery stream
+        carries the whole subtree, so the call that discovers a split
+        returns the streamed notifications instead of fetching them again,
+        unless a data `type` is requested, which subscriptions cannot
+        filter.  Adaptive Gets bypass the cache and `shard_size`.
+
+        The `use_models` option limits the response to data of the given
+        models.  Entries are model names, `supported_models` entries of a
+        :class:`gnmi.messages.CapabilitiesResponse_` or gnmi.ModelData.
+        Names are completed with organization and version from the
+        session's capabilities cache, when it has the target.
+
+        `paths` may also be a :class:`PreparedGet` from `prepare_get`,
+        `options` are then ignored.
+
         :param paths: List of paths
         :type paths: list
         :param options:
@@ -179,26 +294,315 @@ class Session(object):
         :rtype: gnmi.messages.GetResponse_
         """
 
-        response: Optional[GetResponse_] = None
-        prefix = self._parse_path(options.get("prefix"))
-        encoding = util.get_gnmi_constant(options.get("encoding") or "json")
-        type_ = DATA_TYPE_MAP.index(options.get("type") or "all")
-        
-        paths = [self._parse_path(path) for path in paths]
-        
-        _gr = pb.GetRequest(path=paths, prefix=prefix, encoding=encoding,
-                            type=type_)  # type: ignore
+        if isinstance(paths, PreparedGet):
+            prepared = paths
+        else:
+            prepared = self.prepare_get(paths, options)
+
+        if prepared.adaptive:
+            response = self._get_adaptive(list(prepared.paths),
+                                          prepared.template)
+        elif self.cache is None:
+            response = self._send_get(prepared.requests)
+        else:
+            response = self._get_cached(prepared)
+
+        return GetResponse_(response)
+
+    def prepare_get(self, paths: list, options: GetOptions = {},
+                    serialize: bool = False) -> "PreparedGet":
+        r"""Build the Get requests for `paths` once, for repeated calls
+
+        Usage::
+
+            In [12]: poll = sess.prepare_get(paths, {"shard_size": 50})
+            In [13]: while True:
+                ...:     resp = sess.get(poll)
+                ...:     time.sleep(5)
+
+        :param paths: List of paths
+        :type paths: list
+        :param options:
+        :type options: gnmi.structures.GetOptions
+        :param serialize: also serialize the requests, later calls send the
+            bytes as they are
+        :type serialize: bool
+        :rtype: gnmi.session.PreparedGet
+        """
+
+        # everything but the paths, shared by all requests of this call
+        template = pb.GetRequest(
+            prefix=parse_path(options.get("prefix")),
+            encoding=self._encoding(options.get("encoding")),
+            type=DATA_TYPE_MAP.index(options.get("type") or "all"),
+            use_models=self._build_models(options.get("use_models") or []))
+        shard_size = options.get("shard_size")
+        adaptive = bool(options.get("adaptive"))
+
+        paths = [parse_path(path) for path in paths]
+
+        requests: list = []
+        if not adaptive:
+            requests = self._shards(paths, template, shard_size)
+            if serialize:
+                requests = [_gr.SerializeToString() for _gr in requests]
+
+        return PreparedGet(tuple(paths), template, shard_size, adaptive,
+                           tuple(requests), options.get("ttl"))
+
+    def _build_models(self, models: list) -> list:
+        # names are completed from cached capabilities, when available
+        cached = None
+        if self.capabilities_cache is not None and \
+                any(isinstance(model, str) for model in models):
+            cached = self.capabilities_cache.get(self.hostaddr)
+
+        known = {}
+        if cached is not None:
+            known = {model.name: model for model in cached.raw.supported_models}
+
+        result = []
+        for model in models:
+            if isinstance(model, str):
+                model = known.get(model) or pb.ModelData(name=model)
+            elif isinstance(model, dict):
+                model = pb.ModelData(**model)
+            elif not isinstance(model, pb.ModelData):
+                raise ValueError("Invalid model: %s" % str(model))
+            result.append(model)
+        return result
+
+    def _get(self, paths, template, shard_size):
+        return self._send_get(self._shards(paths, template, shard_size))
+
+    def _shards(self, paths, template, shard_size):
+        shard_size = shard_size or len(paths) or 1
+
+        requests = []
+        for pos in range(0, max(len(paths), 1), shard_size):
+            _gr = pb.GetRequest()
+            _gr.CopyFrom(template)
+            _gr.path.extend(paths[pos:pos + shard_size])
+            requests.append(_gr)
+
+        return requests
+
+    def _send_get(self, requests):
+        if isinstance(requests[0], bytes):
+            call = self._channel.unary_unary(
+                "/gnmi.gNMI/Get", response_deserializer=pb.GetResponse.FromString)
+        else:
+            call = self._stub.Get
+
+        if len(requests) == 1:
+            try:
+                return call(requests[0], metadata=self.metadata)
+            except grpc.RpcError as rpcerr:
+                status = Status_.from_call(rpcerr)
+                raise GrpcError(status)
+
+        # shards share the channel, responses are merged in request order
+        calls = [call.future(_gr, metadata=self.metadata)
+                 for _gr in requests]
+        merged = pb.GetResponse()
 
         try:
-            response = self._stub.Get(_gr, metadata=self.metadata)
+            for call in calls:
+                merged.notification.extend(call.result().notification)
         except grpc.RpcError as rpcerr:
+            for call in calls:
+                call.cancel()
             status = Status_.from_call(rpcerr)
             raise GrpcError(status)
 
-        return GetResponse_(response)
+        return merged
+
+    def _get_adaptive(self, paths, template):
+        prefix = template.prefix
+
+        def key(path):
+            full = util.join_paths(prefix, path)
+            return (self.hostaddr, Path_(full).to_string())
+
+        def merge(parts):
+            merged = pb.GetResponse()
+            for path, template_ in parts:
+                response = self._get_adaptive([path], template_)
+                merged.notification.extend(response.notification)
+            return merged
+
+        def split(children, path):
+            # splits are remembered as absolute paths.  Children below the
+            # prefix of this call are requested relative to it, others, as
+            # under a prefix with a key wildcarded, without a prefix.
+            absolute = pb.GetRequest()
+            absolute.CopyFrom(template)
+            absolute.prefix.CopyFrom(pb.Path(origin=prefix.origin,
+                                             target=prefix.target))
+            depth = len(prefix.elem)
+            parts = []
+            for child in children:
+                if list(child.elem[:depth]) == list(prefix.elem):
+                    parts.append((pb.Path(origin=path.origin,
+                                          elem=child.elem[depth:]), template))
+                else:
+                    parts.append((child, absolute))
+            return parts
+
+        if len(paths) == 1 and key(paths[0]) in self._partitions:
+            return merge(split(self._partitions[key(paths[0])], paths[0]))
+        if len(paths) > 1 and any(key(p) in self._partitions for p in paths):
+            return merge([(path, template) for path in paths])
+
+        try:
+            return self._get(paths, template, None)
+        except GrpcError as err:
+            if err.status.code != grpc.StatusCode.RESOURCE_EXHAUSTED:
+                raise
+            if len(paths) > 1:
+                return merge([(path, template) for path in paths])
+
+            children, streamed = self._discover(paths[0], template)
+            if not children:
+                raise
+
+        self._partitions[key(paths[0])] = children
+        if template.type == pb.GetRequest.ALL:
+            # the discovery stream already carried the whole subtree
+            return pb.GetResponse(notification=streamed)
+        return merge(split(children, paths[0]))
+
+    def _discover(self, path, template):
+        # child containers of `path` as absolute paths, and the streamed
+        # notifications
+        prefix = template.prefix
+        depth = len(prefix.elem) + len(path.elem)
+        options: GetOptions = {"prefix": Path_(prefix),
+                               "encoding": pb.Encoding.Name(template.encoding),
+                               "use_models": list(template.use_models)}
+        children = []
+        streamed = []
+        seen = set()
+
+        for notif in self.get_stream([Path_(path)], options):
+            streamed.append(notif.raw)
+            base = list(notif.raw.prefix.elem)
+            for update in notif.raw.update:
+                elems = base + list(update.path.elem)
+                if len(elems) <= depth:
+                    continue
+                # the whole child path, the entries of an unkeyed list all
+                # have children of the same name
+                child = elems[:depth + 1]
+                ident = tuple((elem.name, tuple(sorted(elem.key.items())))
+                              for elem in child)
+                if ident not in seen:
+                    seen.add(ident)
+                    children.append(pb.Path(
+                        origin=prefix.origin or path.origin, elem=child))
+
+        return children, streamed
+
+    def get_stream(self, paths: list,
+                   options: GetOptions = {}) -> Iterator[Notification_]:
+        r"""Get snapshot of state, yielding notifications as they arrive
+
+        Uses a subscription in "once" mode so very large trees are never
+        held in memory as a single GetResponse.  The iterator ends when the
+        target signals the end of the snapshot.  The `type` and
+        `shard_size` options do not apply.
+
+        Usage::
+
+            In [12]: for notif in sess.get_stream(["/"]):
+                ...:     for update in notif:
+                ...:         print(notif.prefix + update.path, update.value)
+
+        :param paths: List of paths
+        :type paths: list
+        :param options:
+        :type options: gnmi.structures.GetOptions
+        :rtype: gnmi.messages.Notification_
+        """
+
+        prefix = parse_path(options.get("prefix"))
+        encoding = self._encoding(options.get("encoding"))
+        models = self._build_models(options.get("use_models") or [])
+
+        subs = [pb.Subscription(path=parse_path(path)) for path in paths]
+        sub_list = pb.SubscriptionList(prefix=prefix,
+                                       mode=MODE_MAP.index("once"),
+                                       encoding=encoding, subscription=subs,
+                                       use_models=models)
+
+        responses = self._stub.Subscribe(
+            iter([pb.SubscribeRequest(subscribe=sub_list)]),
+            metadata=self.metadata)
+
+        try:
+            for response in responses:
+                if response.HasField("sync_response"):
+                    break
+                elif response.HasField("update"):
+                    yield Notification_(response.update)
+                else:
+                    raise ValueError("Unknown response: " + str(response))
+        except grpc.RpcError as rpcerr:
+            status = Status_.from_call(rpcerr)
+            raise GrpcError(status)
+        finally:
+            responses.cancel()
+
+    def _get_cached(self, prepared):
+        paths = list(prepared.paths)
+        template = prepared.template
+        shard_size = prepared.shard_size
+
+        def get_all():
+            # prepared requests are reused when every path is requested
+            return self._send_get(prepared.requests)
+
+        models = tuple(sorted((m.name, m.organization, m.version)
+                              for m in template.use_models))
+        keys = [(self.hostaddr,
+                 Path_(util.join_paths(template.prefix, path)).to_string(),
+                 template.type, template.encoding, models) for path in paths]
+        notifications = [self.cache.get(key) for key in keys]
+        missing = [i for i, notif in enumerate(notifications) if notif is None]
+
+        if not missing:
+            return pb.GetResponse(notification=notifications)
+
+        if len(missing) == len(paths):
+            response = get_all()
+        else:
+            response = self._get([paths[i] for i in missing], template,
+                                 shard_size)
+
+        # entries need one notification per path
+        if len(response.notification) != len(missing):
+            if len(missing) == len(paths):
+                return response
+            return get_all()
+
+        for i, notif in zip(missing, response.notification):
+            self.cache.put(keys[i], notif, prepared.ttl)
+            notifications[i] = notif
+
+        return pb.GetResponse(notification=notifications)
+
+    def _invalidate(self, request):
+        if self.cache is None:
+            return
+        paths = list(request.delete)
+        paths += [update.path for update in request.replace]
+        paths += [update.path for update in request.update]
+        for path in paths:
+            path = Path_(util.join_paths(request.prefix, path)).to_string()
+            self.cache.invalidate(self.hostaddr, path)
 
     def set(self, deletes: list = [], replacements: list = [], updates: list = [],
-            options: Options = {}) -> SetResponse_:
+            options: SetOptions = {}) -> SetResponse_:
         r"""Set set, update or delete value from specified path
 
         Usage::
@@ -206,6 +610,10 @@ class Session(object):
             In [3]: updates = [("/system/config/hostname", "minemeow")]
             In [4]: sess.set(updates=updates)
 
+        With ``options={"coalesce": "json_ietf"}`` sibling leaf updates are
+        sent as one JSON-IETF update per container, "auto" only does so
+        where it makes the request smaller, see `gnmi.batch.coalesce`.
+
         :param updates: List of updates
         :type updates: list
         :param replacements: List of replacements
@@ -213,11 +621,11 @@ class Session(object):
         :param deletes: List of deletes
         :type deletes: list
         :param options:
-        :type options: gnmi.structures.Options
+        :type options: gnmi.structures.SetOptions
         :rtype: gnmi.messages.SetResponse_
         """
 
-        prefix = self._parse_path(options.get("prefix"))
+        prefix = parse_path(options.get("prefix"))
         
         setargs = dict(prefix=prefix, delete=[], replace=[], update=[])
 
@@ -225,8 +633,11 @@ class Session(object):
             setargs["delete"].append(self._build_update(delete))
         for replace in replacements:
             setargs["replace"].append(self._build_update(replace))
-        for update in updates:
-            setargs["update"].append(self._build_update(update))
+        if options.get("coalesce"):
+            setargs["update"] = coalesce(updates, options["coalesce"])
+        else:
+            for update in updates:
+                setargs["update"].append(self._build_update(update))
 
 
         _sr = pb.SetRequest(**setargs)
@@ -236,6 +647,66 @@ class Session(object):
         except grpc.RpcError as rpcerr:
             status = Status_.from_call(rpcerr)
             raise GrpcError(status)
+        finally:
+            self._invalidate(_sr)
+
+    def set_serialized(self, request: bytes) -> SetResponse_:
+        r"""Send an already serialized SetRequest
+
+        Lets the same request bytes be sent to many targets without
+        building or serializing it again for each one.
+
+        :param request: serialized gnmi.SetRequest
+        :type request: bytes
+        :rtype: gnmi.messages.SetResponse_
+        """
+
+        call = self._channel.unary_unary(
+            "/gnmi.gNMI/Set", response_deserializer=pb.SetResponse.FromString)
+
+        try:
+            return SetResponse_(call(request, metadata=self.metadata))
+        except grpc.RpcError as rpcerr:
+            status = Status_.from_call(rpcerr)
+            raise GrpcError(status)
+        finally:
+            if self.cache is not None:
+                self._invalidate(pb.SetRequest.FromString(request))
+
+    def set_batch(self, batch: SetBatch) -> SetResponse_:
+        r"""Send a batch as one or more size-bounded SetRequests
+
+        Requests are sent in order and their results are merged into a
+        single response.  A failing request raises, earlier requests of the
+        batch have already been applied by then.
+
+        Usage::
+
+            In [3]: from gnmi.batch import SetBatch
+            In [4]: batch = SetBatch(max_size=1024 * 1024)
+            In [5]: batch.extend(updates=updates)
+            In [6]: resp = sess.set_batch(batch)
+
+        :param batch: operations to send
+        :type batch: gnmi.batch.SetBatch
+        :rtype: gnmi.messages.SetResponse_
+        """
+
+        merged = pb.SetResponse(prefix=batch.prefix)
+
+        for _sr in batch.requests():
+            try:
+                response = self._stub.Set(_sr, metadata=self.metadata)
+            except grpc.RpcError as rpcerr:
+                status = Status_.from_call(rpcerr)
+                raise GrpcError(status)
+            finally:
+                self._invalidate(_sr)
+
+            merged.response.extend(response.response)
+            merged.timestamp = response.timestamp
+
+        return SetResponse_(merged)
 
     def subscribe(self, paths: list,
             options: SubscribeOptions = {}) -> Iterator[SubscribeResponse_]:
@@ -280,6 +751,30 @@ class Session(object):
             /interfaces/interface[name=Ethernet1]/config/name Ethernet1
             <output-omitted>
         
+        A path may come with its own submode, interval, heartbeat and
+        suppress options as a (path, options) tuple, so fast counters and
+        on-change state share one stream::
+
+            In [62]: paths = [
+                ...:     ("/interfaces/interface/state/counters",
+                ...:      {"submode": "sample", "interval": 10 * 10**9}),
+                ...:     "/interfaces/interface/config",
+                ...: ]
+            In [63]: responses = sess.subscribe(paths, {"submode": "on-change"})
+
+        With the `minimize` option, paths covered by an ancestor, a wildcard
+        or a duplicate with the same options are left out, see
+        `gnmi.planner.minimize`.  `prepare_subscribe` reports them in
+        `PreparedSubscribe.pruned`.
+
+        The `streams` option spreads the paths over that many parallel
+        streams to the target, balanced by their estimated update rate, see
+        `gnmi.planner.balance`, and merges the responses into one iterator.
+        The order of responses across streams is not preserved.
+
+        `paths` may also be a :class:`PreparedSubscribe` from
+        `prepare_subscribe`, `options` are then ignored.
+
         :param paths: List of paths
         :type paths: list
         :param options:
@@ -287,39 +782,25 @@ class Session(object):
         :rtype: gnmi.messages.SubscribeResponse_
         """
 
-        aggregate = options.get("aggregate", False)
-        encoding = util.get_gnmi_constant(options.get("encoding", "json"))
-        heartbeat = options.get("heartbeat", None)
-        interval = options.get("interval", None)
-        mode = MODE_MAP.index(options.get("mode", "stream"))
-        prefix = self._parse_path(options.get("prefix"))
-        qos = pb.QOSMarking(marking=options.get("qos", 0))
-        submode = util.get_gnmi_constant(options.get("submode") or "on-change")
-        suppress = options.get("suppress", False)
-        timeout = options.get("timeout", None)
-        use_alias = options.get("use_alias", False)
-
-        subs = []
-        for path in paths:
-            path = self._parse_path(path)
-            sub = pb.Subscription(path=path, mode=submode,
-                                  suppress_redundant=suppress,
-                                  sample_interval=interval,
-                                  heartbeat_interval=heartbeat)
-            subs.append(sub)
-
-        def _sr():
+        if isinstance(paths, PreparedSubscribe):
+            prepared = [paths]
+        elif (options.get("streams") or 1) > 1:
+            if options.get("minimize"):
+                # before sharding, paths may cover others in other shards
+                paths = minimize(paths, options).paths
+            prepared = [self.prepare_subscribe(shard, options)
+                        for shard in balance(paths, options["streams"],
+                                              options)]
+        else:
+            prepared = [self.prepare_subscribe(paths, options)]
 
-            sub_list = pb.SubscriptionList(prefix=prefix, mode=mode,
-                                           allow_aggregation=aggregate,
-                                           encoding=encoding, subscription=subs,
-                                           use_aliases=use_alias, qos=qos)
-            req_iter = pb.SubscribeRequest(subscribe=sub_list)
-            yield req_iter
+        calls = [self.open_stream(p) for p in prepared]
+        if len(calls) == 1:
+            responses = calls[0]
+        else:
+            responses = self._merge(calls)
 
         try:
-            responses = self._stub.Subscribe(
-                _sr(), timeout, metadata=self.metadata)
             for response in responses:
                 if response.HasField("sync_response"):
                     # TODO: notify the user about this?
@@ -336,3 +817,120 @@ class Session(object):
                 raise GrpcDeadlineExceeded(status)
             else:
                 raise GrpcError(status)
+        finally:
+            for call in calls:
+                call.cancel()
+
+    def open_stream(self, prepared: "PreparedSubscribe"):
+        r"""Open a Subscribe stream for a :class:`PreparedSubscribe`
+
+        For building on subscriptions, `subscribe` wraps this.  The returned
+        gRPC call yields raw gnmi.SubscribeResponse messages, including sync
+        responses, and its `cancel` method ends the stream.
+
+        Usage::
+
+            In [64]: prepared = sess.prepare_subscribe(paths)
+            In [65]: call = sess.open_stream(prepared)
+            In [66]: for response in call:
+                ...:     ...
+            In [67]: call.cancel()
+
+        :param prepared: request from `prepare_subscribe`
+        :type prepared: gnmi.session.PreparedSubscribe
+        :rtype: grpc.Call
+        """
+        if isinstance(prepared.request, bytes):
+            call = self._channel.stream_stream(
+                "/gnmi.gNMI/Subscribe",
+                response_deserializer=pb.SubscribeResponse.FromString)
+        else:
+            call = self._stub.Subscribe
+
+        return call(iter([prepared.request]), prepared.timeout,
+                    metadata=self.metadata)
+
+    def _merge(self, calls):
+        # one reader thread per stream feeds a bounded queue, so a slow
+        # consumer still pushes back on every stream
+        merged: queue.Queue = queue.Queue(maxsize=MERGE_QUEUE_SIZE)
+        done = threading.Event()
+
+        def read(call):
+            try:
+                for response in call:
+                    util.put_until(merged, (response, None), done)
+                util.put_until(merged, (None, None), done)
+            except grpc.RpcError as rpcerr:
+                util.put_until(merged, (None, rpcerr), done)
+
+        for call in calls:
+            threading.Thread(target=read, args=(call,), daemon=True).start()
+
+        try:
+            running = len(calls)
+            while running:
+                response, error = merged.get()
+                if error is not None:
+                    raise error
+                if response is None:
+                    running -= 1
+                    continue
+                yield response
+        finally:
+            done.set()
+
+    def prepare_subscribe(self, paths: list, options: SubscribeOptions = {},
+                          serialize: bool = False) -> "PreparedSubscribe":
+        r"""Build the SubscribeRequest for `paths` once, for repeated
+        subscriptions
+
+        :param paths: List of paths or (path, SubscriptionOptions) tuples
+        :type paths: list
+        :param options:
+        :type options: gnmi.structures.SubscribeOptions
+        :param serialize: also serialize the request, later calls send the
+            bytes as they are
+        :type serialize: bool
+        :rtype: gnmi.session.PreparedSubscribe
+        """
+
+        aggregate = options.get("aggregate", False)
+        encoding = self._encoding(options.get("encoding"))
+        heartbeat = options.get("heartbeat", None)
+        interval = options.get("interval", None)
+        mode = MODE_MAP.index(options.get("mode", "stream"))
+        prefix = parse_path(options.get("prefix"))
+        qos = pb.QOSMarking(marking=options.get("qos", 0))
+        submode = options.get("submode") or "on-change"
+        suppress = options.get("suppress", False)
+        timeout = options.get("timeout", None)
+        use_alias = options.get("use_alias", False)
+
+        pruned: list = []
+        if options.get("minimize"):
+            paths, pruned = minimize(paths, options)
+
+        subs = []
+        for entry in paths:
+            path, sub_options = split_entry(entry)
+            path = parse_path(path)
+            sub = pb.Subscription(
+                path=path,
+                mode=util.get_gnmi_constant(
+                    sub_options.get("submode") or submode),
+                suppress_redundant=sub_options.get("suppress", suppress),
+                sample_interval=sub_options.get("interval", interval),
+                heartbeat_interval=sub_options.get("heartbeat", heartbeat))
+            subs.append(sub)
+
+        sub_list = pb.SubscriptionList(prefix=prefix, mode=mode,
+                                       allow_aggregation=aggregate,
+                                       encoding=encoding, subscription=subs,
+                                       use_aliases=use_alias, qos=qos)
+        request = pb.SubscribeRequest(subscribe=sub_list)
+        if serialize:
+            request = request.SerializeToString()
+
+        return PreparedSubscribe(request, timeout, tuple(pruned))
+
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.state
+~~~~~~~~~~~~~~~~
+
+Latest-value cache of telemetry state per target
+
+"""
+
+from typing import Dict, Iterator, List
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.index import path_matches
+from gnmi.messages import Path_, SubscribeResponse_, Update_
+from gnmi.util import join_paths
+
+
+class StateCache(object):
+    r"""Holds the most recent update for every path seen per target
+
+    Updates are stored with their full path (prefix joined), deletes drop
+    the deleted path and its subtree.
+
+    Usage::
+
+        In [1]: from gnmi.state import StateCache
+        In [2]: state = StateCache()
+        In [3]: for resp in sess.subscribe(paths):
+           ...:     state.apply(resp, target=sess.hostaddr)
+        In [4]: state.get("/system/config/hostname", target=sess.hostaddr)
+        Out[4]: 'veos3-782f'
+
+    """
+
+    def __init__(self):
+        self._targets: Dict[str, Dict[str, pb.Update]] = {}  # type: ignore
+
+    def __len__(self):
+        return sum(len(paths) for paths in self._targets.values())
+
+    @property
+    def targets(self) -> List[str]:
+        return list(self._targets)
+
+    def apply(self, response, target: str = ""):
+        """Apply a subscribe response or a single gnmi.Notification
+
+        :param response: response or notification
+        :type response: gnmi.messages.SubscribeResponse_,
+            gnmi.SubscribeResponse or gnmi.Notification
+        :param target: target the response came from
+        :type target: str
+        """
+        if isinstance(response, SubscribeResponse_):
+            response = response.raw
+        if isinstance(response, pb.SubscribeResponse):
+            if not response.HasField("update"):
+                return
+            response = response.update
+
+        paths = self._targets.setdefault(target, {})
+        prefix = response.prefix
+
+        for path in response.delete:
+            path = Path_(join_paths(prefix, path)).to_string()
+            for key in [k for k in paths if path_matches(k, path)]:
+                del paths[key]
+
+        for update in response.update:
+            full = pb.Update()
+            full.CopyFrom(update)
+            full.path.CopyFrom(join_paths(prefix, update.path))
+            paths[Path_(full.path).to_string()] = full
+
+    def get(self, path: str, target: str = ""):
+        """Return the value of `path` or `None` if not present"""
+        path = Path_.from_string(path).to_string()
+        update = self._targets.get(target, {}).get(path)
+        if update is None:
+            return None
+        return Update_(update).value
+
+    def updates(self, target: str = "") -> Iterator[Update_]:
+        """Yield the cached updates of `target` with full paths"""
+        for update in self._targets.get(target, {}).values():
+            yield Update_(update)
+
+    def notifications(self, target: str = "", timestamp: int = 0,
+                      size: int = 1000) -> Iterator[pb.Notification]:  # type: ignore
+        """Yield the state of `target` as notifications of `size` updates"""
+        updates = list(self._targets.get(target, {}).values())
+        for pos in range(0, len(updates), size):
+            yield pb.Notification(timestamp=timestamp,
+                                  update=updates[pos:pos + size])
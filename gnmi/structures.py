@@ -30,17 +30,34 @@ class SubscribeOptions(Options, total=False):
     aggregate: bool
     heartbeat: Optional[int]
     interval: Optional[int]
+    minimize: bool
     mode: str
     qos: int
+    streams: int
     submode: str
     suppress: bool
     timeout: Optional[int]
     use_alias: bool
 
 
+class SubscriptionOptions(TypedDict, total=False):
+    heartbeat: Optional[int]
+    interval: Optional[int]
+    priority: int
+    rate: float
+    submode: str
+    suppress: bool
+
+
+class SetOptions(Options, total=False):
+    coalesce: str
+
 class GetOptions(Options, total=False):
     type: str
     use_models: list
+    shard_size: Optional[int]
+    adaptive: bool
+    ttl: Optional[float]
 
 class GrpcOptions(TypedDict, total=False):
     server_host_override: str
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.throttle
+~~~~~~~~~~~~~~~~
+
+Latest-wins rate limiting of subscription responses
+
+"""
+
+import collections
+import threading
+import time
+
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.index import path_matches
+from gnmi.messages import Path_, SubscribeResponse_
+from gnmi.planner import covers, path_elems
+from gnmi.util import join_paths
+
+DEFAULT_WINDOW = 1.0
+
+
+class Throttle(object):
+    r"""Passes on at most one value per path and interval, the newest
+
+    Responses are read from the subscription in a background thread.  Every
+    `window` seconds the latest update, or delete, of each path whose
+    interval has elapsed is emitted, grouped into one notification per
+    timestamp with full paths.  Superseded updates are dropped and a delete
+    drops the pending updates below it.  When the subscription ends, what is
+    pending is emitted at once, so the final state is never lost.
+
+    A consumer that stops early can only end a stream the throttle is able
+    to cancel: the gRPC call of `Session.open_stream`, or any subscription
+    along with a `cancel` callback.  A generator such as `Session.subscribe`
+    is otherwise only closed once its next response arrives.
+
+    Usage::
+
+        In [1]: from gnmi.throttle import Throttle
+        In [2]: throttle = Throttle(1.0, {
+           ...:     "/interfaces/interface/state/counters": 10.0})
+        In [3]: call = sess.open_stream(sess.prepare_subscribe(paths))
+        In [4]: for resp in throttle(call):
+           ...:     ...
+
+    :param window: interval in seconds, and the timer tick
+    :type window: float
+    :param intervals: per subtree intervals in seconds, the deepest matching
+        subtree applies.  Subtrees may use "*" and omit list keys.
+    :type intervals: dict
+    """
+
+    def __init__(self, window: float = DEFAULT_WINDOW,
+                 intervals: Optional[Dict[str, float]] = None):
+        self.window = window
+        self.intervals = []
+        for path, interval in (intervals or {}).items():
+            self.intervals.append((path_elems(path), interval))
+        # deepest subtree first
+        self.intervals.sort(key=lambda item: len(item[0][1]), reverse=True)
+
+        self.received = 0
+        self.emitted = 0
+
+        self._cond = threading.Condition()
+        # path -> (timestamp, gnmi.Update, or gnmi.Path of a delete)
+        self._pending: Dict[str, tuple] = collections.OrderedDict()
+        self._last: Dict[str, float] = {}
+        self._interval_of: Dict[str, float] = {}
+
+    @property
+    def dropped(self) -> int:
+        """Updates superseded before being emitted"""
+        with self._cond:
+            return self.received - self.emitted - len(self._pending)
+
+    def interval(self, path: str) -> float:
+        """Interval in seconds that applies to `path`"""
+        interval = self._interval_of.get(path)
+        if interval is None:
+            interval = self.window
+            origin, elems = path_elems(path)
+            for (sub_origin, sub_elems), value in self.intervals:
+                if sub_origin == origin and covers(sub_elems, elems):
+                    interval = value
+                    break
+            self._interval_of[path] = interval
+        return interval
+
+    def add(self, response):
+        """Record the updates and deletes of a response"""
+        if isinstance(response, SubscribeResponse_):
+            response = response.raw
+        if isinstance(response, pb.SubscribeResponse):
+            if not response.HasField("update"):
+                return
+            response = response.update
+
+        prefix = response.prefix
+        timestamp = response.timestamp
+
+        with self._cond:
+            for path in response.delete:
+                path = join_paths(prefix, path)
+                key = Path_(path).to_string()
+                for pending in [k for k in self._pending
+                                if path_matches(k, key)]:
+                    del self._pending[pending]
+                self._pending[key] = (timestamp, path)
+                self.received += 1
+
+            for update in response.update:
+                full = pb.Update()
+                full.CopyFrom(update)
+                full.path.CopyFrom(join_paths(prefix, update.path))
+                key = Path_(full.path).to_string()
+                self._pending.pop(key, None)
+                self._pending[key] = (timestamp, full)
+                self.received += 1
+
+    def flush(self, force: bool = False) -> Iterator[SubscribeResponse_]:
+        """Emit the pending paths whose interval has elapsed
+
+        :param force: emit every pending path
+        :type force: bool
+        """
+        now = time.monotonic()
+        due = []
+        with self._cond:
+            for key in list(self._pending):
+                if force or now - self._last.get(key, 0.0) >= \
+                        self.interval(key):
+                    due.append(self._pending.pop(key))
+                    self._last[key] = now
+            self.emitted += len(due)
+
+        notifications: dict = collections.OrderedDict()
+        for timestamp, item in due:
+            notif = notifications.get(timestamp)
+            if notif is None:
+                notif = notifications[timestamp] = pb.Notification(
+                    timestamp=timestamp)
+            if isinstance(item, pb.Update):
+                notif.update.append(item)
+            else:
+                notif.delete.append(item)
+
+        for notif in notifications.values():
+            yield SubscribeResponse_(pb.SubscribeResponse(update=notif))
+
+    def __call__(self, responses: Iterable,
+                 cancel: Optional[Callable[[], None]] = None
+                 ) -> Iterator[SubscribeResponse_]:
+        """Throttle a subscription
+
+        Errors of the subscription are raised once its pending updates have
+        been emitted.  When the consumer stops early, reading stops, `cancel`
+        is called and `responses` is cancelled or closed.
+
+        :param responses: responses of a subscription
+        :param cancel: ends the subscription of `responses`
+        :type cancel: callable
+        """
+        state = {"done": False, "error": None, "stopped": False}
+
+        def read():
+            try:
+                for response in responses:
+                    if state["stopped"]:
+                        break
+                    self.add(response)
+            except Exception as exc:  # re-raised by the consumer
+                if not state["stopped"]:
+                    state["error"] = exc
+            finally:
+                _close(responses, cancel)
+                with self._cond:
+                    state["done"] = True
+                    self._cond.notify()
+
+        threading.Thread(target=read, daemon=True).start()
+
+        try:
+            next_tick = time.monotonic() + self.window
+            while True:
+                with self._cond:
+                    if not state["done"]:
+                        self._cond.wait(max(next_tick - time.monotonic(), 0))
+                    done = state["done"]
+
+                if done:
+                    yield from self.flush(force=True)
+                    if state["error"] is not None:
+                        raise state["error"]
+                    return
+
+                if time.monotonic() >= next_tick:
+                    next_tick += self.window
+                    yield from self.flush()
+        finally:
+            state["stopped"] = True
+            # a blocked reader is woken up by the cancel, or closes
+            # `responses` itself with its next response
+            _close(responses, cancel)
+
+
+def _close(responses, cancel):
+    if cancel is not None:
+        cancel()
+    if hasattr(responses, "cancel"):
+        responses.cancel()
+    elif hasattr(responses, "close"):
+        try:
+            responses.close()
+        except ValueError:
+            # generator running in the reader thread
+            pass
@@ -3,9 +3,11 @@
 # Arista Networks, Inc. Confidential and Proprietary.
 
 import os
+import queue
 import sys
 import re
 import json
+import time
 from typing import Any, List
 import google.protobuf as _
 import gnmi.proto.gnmi_pb2 as pb  # type: ignore
@@ -36,6 +38,37 @@ def parse_duration(duration):
     return val * multipliers[unit]
 
 
+def timestamp_ns():
+    """Current time in nanoseconds since the epoch"""
+    # time.time_ns was added in 3.7
+    if hasattr(time, "time_ns"):
+        return time.time_ns()
+    return int(time.time() * 1000000000)
+
+
+def join_paths(prefix, path):
+    """Join two gnmi.Path messages keeping the prefix origin and target"""
+    return pb.Path(origin=prefix.origin or path.origin, target=prefix.target,
+                   elem=list(prefix.elem) + list(path.elem))
+
+
+def put_until(queue_, item, done, timeout: float = 0.1) -> bool:
+    """Put `item` on a bounded queue, waiting while it is full until `done`
+    is set
+
+    :param queue_: bounded queue.Queue
+    :param done: threading.Event that ends the wait
+    :rtype: bool, whether the item was put
+    """
+    while not done.is_set():
+        try:
+            queue_.put(item, timeout=timeout)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
 def enable_debuging():
     os.environ['GRPC_TRACE'] = 'all'
     os.environ['GRPC_VERBOSITY'] = 'DEBUG'
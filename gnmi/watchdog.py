@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+"""
+gnmi.watchdog
+~~~~~~~~~~~~~~~~
+
+Restart subscription streams that stop delivering
+
+"""
+
+import collections
+import queue
+import threading
+import time
+
+from typing import Iterator, List, Optional
+
+import grpc
+
+from gnmi.proto import gnmi_pb2 as pb  # type: ignore
+from gnmi.messages import Status_, SubscribeResponse_
+from gnmi.exceptions import GrpcError, SubscriptionStalled
+from gnmi.planner import balance, minimize
+from gnmi.structures import SubscribeOptions
+from gnmi.util import put_until
+
+DEFAULT_GRACE = 5.0
+DEFAULT_QUEUE_SIZE = 10000
+
+
+class Stall(collections.namedtuple("Stall", (
+        "time", "stream", "idle", "expected"))):
+    r"""A stream found silent and re-established
+
+    :param time: wall clock time of the restart in seconds
+    :param stream: index of the stream, see `WatchedSubscription.expected`
+    :param idle: seconds since the last message of the stream
+    :param expected: longest gap in seconds the stream's heartbeat and
+        sample intervals allow
+    """
+
+    __slots__ = ()
+
+
+def expected_interval(request) -> Optional[float]:
+    """Longest gap in seconds between messages of a stream subscription
+    with `request`, `None` when the target may stay silent
+
+    A heartbeat bounds the gap of every subscription, a sample interval
+    that of a sample subscription not suppressing redundant values.  The
+    stream is silent no longer than its most frequent subscription.
+    """
+    if isinstance(request, bytes):
+        request = pb.SubscribeRequest.FromString(request)
+    sub_list = request.subscribe
+    if sub_list.mode != pb.SubscriptionList.STREAM:
+        return None
+
+    intervals = []
+    for sub in sub_list.subscription:
+        if sub.heartbeat_interval:
+            intervals.append(sub.heartbeat_interval)
+        if sub.mode == pb.SAMPLE and sub.sample_interval and \
+                not sub.suppress_redundant:
+            intervals.append(sub.sample_interval)
+    if not intervals:
+        return None
+    return min(intervals) / 1e9
+
+
+class _Stream(object):
+
+    def __init__(self, index: int, prepared, expected: Optional[float]):
+        self.index = index
+        self.prepared = prepared
+        self.expected = expected
+        self.call = None
+        self.last = 0.0
+        self.stalls = 0
+
+
+class WatchedSubscription(object):
+    r"""Stream subscription that re-establishes streams gone silent
+
+    The time since the last message, response or sync, is tracked for each
+    stream.  A stream that stays silent for `grace` seconds longer than its
+    heartbeat or sample interval allows, see `expected_interval`, is
+    cancelled and subscribed again, and the stall is recorded in `events`.
+    A re-established stream starts over with the target's initial updates.
+    Streams of on-change paths without a heartbeat are never restarted.
+
+    With the `streams` option the paths are spread over parallel streams as
+    by `Session.subscribe`, each watched on its own.
+
+    Usage::
+
+        In [1]: from gnmi.watchdog import WatchedSubscription
+        In [2]: sub = WatchedSubscription(sess, paths, {
+           ...:     "submode": "on-change", "heartbeat": 30 * 10**9},
+           ...:     grace=10.0)
+        In [3]: for resp in sub:
+           ...:     ...
+        In [4]: sub.stalls
+        Out[4]: 1
+        In [5]: sub.events
+        Out[5]: [Stall(time=..., stream=0, idle=40.01, expected=30.0)]
+
+    :param session: session to the target
+    :type session: gnmi.session.Session
+    :param paths: paths or (path, SubscriptionOptions) tuples
+    :type paths: list
+    :param options: stream subscription options
+    :type options: gnmi.structures.SubscribeOptions
+    :param grace: seconds of silence tolerated beyond the expected interval
+    :type grace: float
+    :param max_restarts: restarts of a single stream before giving up with
+        `SubscriptionStalled`, unlimited by default
+    :type max_restarts: int
+    """
+
+    def __init__(self, session, paths: list, options: SubscribeOptions = {},
+                 grace: float = DEFAULT_GRACE,
+                 max_restarts: Optional[int] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.session = session
+        self.options = dict(options, mode="stream")
+        self.grace = grace
+        self.max_restarts = max_restarts
+        self.events: List[Stall] = []
+
+        count = self.options.get("streams") or 1
+        if count > 1:
+            if self.options.get("minimize"):
+                paths = minimize(paths, self.options).paths
+            shards = balance(paths, count, self.options)
+        else:
+            shards = [paths]
+
+        self._streams = []
+        for index, shard in enumerate(shards):
+            prepared = session.prepare_subscribe(shard, self.options)
+            self._streams.append(_Stream(index, prepared,
+                                         expected_interval(prepared.request)))
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def expected(self) -> List[Optional[float]]:
+        """Expected interval in seconds of each stream, `None` if unwatched"""
+        return [stream.expected for stream in self._streams]
+
+    @property
+    def stalls(self) -> int:
+        """Streams re-established so far"""
+        return len(self.events)
+
+    def _put(self, item):
+        put_until(self._queue, item, self._done)
+
+    def _start(self, stream: _Stream):
+        call = self.session.open_stream(stream.prepared)
+        with self._lock:
+            stream.call = call
+            stream.last = time.monotonic()
+
+        def read():
+            try:
+                for response in call:
+                    with self._lock:
+                        if stream.call is not call:
+                            return
+                    self._put(response)
+                    # time waiting on the consumer is not the target's
+                    stream.last = time.monotonic()
+            except grpc.RpcError as rpcerr:
+                # a restarted stream is cancelled on purpose
+                with self._lock:
+                    replaced = stream.call is not call
+                if not replaced and not self._done.is_set():
+                    self._put(rpcerr)
+                return
+            with self._lock:
+                if stream.call is not call:
+                    return
+                stream.call = None
+            self._put(stream)
+
+        threading.Thread(target=read, daemon=True).start()
+
+    def _watch(self):
+        watched = [s for s in self._streams if s.expected is not None]
+        if not watched:
+            return
+        tick = min(min(s.expected for s in watched) / 4, self.grace / 4)
+
+        while not self._done.wait(max(tick, 0.001)):
+            if self._queue.full():
+                # the consumer is behind, not the target
+                continue
+            now = time.monotonic()
+            for stream in watched:
+                with self._lock:
+                    if stream.call is None:
+                        continue
+                    idle = now - stream.last
+                if idle <= stream.expected + self.grace:
+                    continue
+
+                if self.max_restarts is not None and \
+                        stream.stalls >= self.max_restarts:
+                    self._put(SubscriptionStalled(stream.index, idle))
+                    return
+
+                stream.stalls += 1
+                self.events.append(Stall(time.time(), stream.index, idle,
+                                         stream.expected))
+                previous = stream.call
+                self._start(stream)
+                previous.cancel()
+
+    def __iter__(self) -> Iterator[SubscribeResponse_]:
+        for stream in self._streams:
+            self._start(stream)
+        threading.Thread(target=self._watch, daemon=True).start()
+
+        try:
+            running = len(self._streams)
+            while running:
+                item = self._queue.get()
+
+                if isinstance(item, _Stream):
+                    # ended by the target
+                    running -= 1
+                    continue
+                if isinstance(item, grpc.RpcError):
+                    raise GrpcError(Status_.from_call(item))
+                if isinstance(item, SubscriptionStalled):
+                    raise item
+
+                if item.HasField("update"):
+                    yield SubscribeResponse_(item)
+        finally:
+            self.close()
+
+    def close(self):
+        """Cancel the underlying streams"""
+        self._done.set()
+        with self._lock:
+            calls = [s.call for s in self._streams if s.call is not None]
+            for stream in self._streams:
+                stream.call = None
+        for call in calls:
+            call.cancel()
@@ -38,4 +38,14 @@ def is_secure():
     if GNMI_SECURE:
         return True
     else:
-        return False
\ No newline at end of file
+        return False
+@pytest.fixture()
+def local_server():
+    from tests.server import Server
+    with Server() as server:
+        yield server
+
+@pytest.fixture()
+def local_session(local_server):
+    from gnmi.session import Session
+    return Session(local_server.target)
@@ -0,0 +1,158 @@
+"""In-process gNMI server backed by a flat path -> TypedValue store"""
+
+import time
+from concurrent import futures
+
+import grpc
+
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.proto import gnmi_pb2_grpc
+from gnmi.index import path_matches
+from gnmi.messages import Path_
+from gnmi.util import join_paths, timestamp_ns
+
+
+def _str(path):
+    return Path_(path).to_string()
+
+
+class Servicer(gnmi_pb2_grpc.gNMIServicer):
+
+    def __init__(self, data=None, delay=0.0, max_updates=None, models=None):
+        self.store = {}
+        self.requests = []
+        # top level container -> model name, for use_models filtering
+        self.models = models or {}
+        self.encodings = [pb.JSON, pb.JSON_IETF, pb.ASCII]
+        # artificial cost per requested Get path, in seconds
+        self.delay = delay
+        # Get responses with more updates fail with RESOURCE_EXHAUSTED
+        self.max_updates = max_updates
+        # this many Subscribe streams go silent after their initial updates
+        self.stall = 0
+        # Subscribe streams ended by the client
+        self.cancelled = 0
+        for path, val in (data or {}).items():
+            self.store[Path_.from_string(path).to_string()] = val
+
+    def Capabilities(self, request, context):
+        self.requests.append(request)
+        return pb.CapabilityResponse(
+            supported_models=[
+                pb.ModelData(name="openconfig-interfaces",
+                             organization="OpenConfig working group",
+                             version="2.4.3")],
+            supported_encodings=self.encodings,
+            gNMI_version="0.7.0")
+
+    def Get(self, request, context):
+        self.requests.append(request)
+        notifs = []
+        for path in request.path:
+            time.sleep(self.delay)
+            query = _str(join_paths(request.prefix, path))
+            if query in self.store:
+                matches = [(query, self.store[query])]
+            else:
+                matches = [(p, v) for p, v in sorted(self.store.items())
+                           if path_matches(p, query)]
+            if request.use_models:
+                names = {model.name for model in request.use_models}
+                matches = [(p, v) for p, v in matches
+                           if self._model(p) in names]
+            updates = [pb.Update(path=Path_.from_string(p).raw, val=v)
+                       for p, v in matches]
+            notifs.append(pb.Notification(timestamp=1, update=updates))
+        if self.max_updates is not None and \
+                sum(len(n.update) for n in notifs) > self.max_updates:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          "response too large")
+        return pb.GetResponse(notification=notifs)
+
+    def Set(self, request, context):
+        self.requests.append(request)
+        results = []
+        for path in request.delete:
+            self._delete(_str(join_paths(request.prefix, path)))
+            results.append(pb.UpdateResult(path=path, op=pb.UpdateResult.DELETE))
+        for update in request.replace:
+            path = _str(join_paths(request.prefix, update.path))
+            self._delete(path)
+            self.store[path] = update.val
+            results.append(pb.UpdateResult(path=update.path,
+                                           op=pb.UpdateResult.REPLACE))
+        for update in request.update:
+            path = _str(join_paths(request.prefix, update.path))
+            self.store[path] = update.val
+            results.append(pb.UpdateResult(path=update.path,
+                                           op=pb.UpdateResult.UPDATE))
+        return pb.SetResponse(prefix=request.prefix, response=results,
+                              timestamp=len(self.requests))
+
+    def Subscribe(self, request_iterator, context):
+        request = next(request_iterator)
+        self.requests.append(request)
+        stalled = self.stall > 0
+        if stalled:
+            self.stall -= 1
+        sub_list = request.subscribe
+        for sub in sub_list.subscription:
+            yield from self._sample(sub_list.prefix, sub)
+        yield pb.SubscribeResponse(sync_response=True)
+
+        if sub_list.mode == pb.SubscriptionList.STREAM:
+            # SAMPLE subscriptions are sent again every interval
+            due = {i: time.monotonic() + sub.sample_interval / 1e9
+                   for i, sub in enumerate(sub_list.subscription)
+                   if sub.mode == pb.SAMPLE and sub.sample_interval}
+            try:
+                while context.is_active():
+                    if stalled:
+                        time.sleep(0.01)
+                        continue
+                    for i in due:
+                        if time.monotonic() >= due[i]:
+                            sub = sub_list.subscription[i]
+                            due[i] += sub.sample_interval / 1e9
+                            yield from self._sample(sub_list.prefix, sub)
+                    time.sleep(0.001 if due else 0.01)
+            finally:
+                if not context.is_active():
+                    self.cancelled += 1
+
+    def _sample(self, prefix, sub):
+        query = _str(join_paths(prefix, sub.path))
+        for path, val in sorted(self.store.items()):
+            if path_matches(path, query):
+                yield pb.SubscribeResponse(update=pb.Notification(
+                    timestamp=timestamp_ns(),
+                    update=[pb.Update(path=Path_.from_string(path).raw,
+                                      val=val)]))
+
+    def _model(self, path):
+        return self.models.get(path.split("/")[1])
+
+    def _delete(self, path):
+        for key in [k for k in self.store if path_matches(k, path)]:
+            del self.store[key]
+
+
+class Server(object):
+
+    def __init__(self, servicer=None, max_workers=16):
+        self.servicer = servicer or Servicer()
+        self._server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=max_workers))
+        gnmi_pb2_grpc.add_gNMIServicer_to_server(self.servicer, self._server)
+        self.port = self._server.add_insecure_port("127.0.0.1:0")
+
+    @property
+    def target(self):
+        return ("127.0.0.1", self.port)
+
+    def __enter__(self):
+        self._server.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.stop(None)
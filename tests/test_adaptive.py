@@ -0,0 +1,45 @@
+import time
+
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.adaptive import AdaptiveSubscription
+
+COUNTERS = "/interfaces/interface[name=Ethernet%d]/state/counters/in-octets"
+
+
+def test_backoff_and_restore(local_server, local_session):
+    servicer = local_server.servicer
+    for i in range(20):
+        servicer.store[COUNTERS % i] = pb.TypedValue(uint_val=i)
+    servicer.store["/system/config/hostname"] = pb.TypedValue(string_val="a")
+
+    sub = AdaptiveSubscription(
+        local_session,
+        [("/interfaces", {"submode": "sample", "interval": 20 * 10**6}),
+         "/system"],
+        max_interval=80 * 10**6, high=50, low=5, cooldown=0.05,
+        queue_size=100)
+
+    seen = 0
+    for resp in sub:
+        seen += 1
+        if not sub.events:
+            # a slow consumer until the intervals back off
+            time.sleep(0.01)
+        elif sub.events[-1].reason == "recovered" and \
+                len(servicer.requests) == len(sub.events) + 2:
+            break
+        assert seen < 5000
+
+    reasons = [event.reason for event in sub.events]
+    assert reasons[0] == "lag"
+    assert reasons[-1] == "recovered"
+    assert sub.scale == 1.0
+
+    # the on-change stream is subscribed once, the sampled one per change
+    requests = [r.subscribe for r in servicer.requests]
+    assert len(requests) == len(reasons) + 2
+    intervals = [r.subscription[0].sample_interval for r in requests
+                 if r.subscription[0].mode == pb.SAMPLE]
+    assert intervals[0] == 20 * 10**6
+    assert max(intervals) <= 80 * 10**6
+    assert intervals[-1] == 20 * 10**6
@@ -83,4 +83,32 @@ def test_set(is_secure, certificates, request):
     gen = replace(GNMI_TARGET, replacements=replacements,
         secure=is_secure, certificates=certificates, auth=GNMI_AUTH)
     for r in gen:
-        pass
\ No newline at end of file
+        pass
+
+def test_rollout():
+    from gnmi.api import rollout
+    from gnmi.exceptions import RolloutAborted
+    from tests.server import Server
+
+    updates = [("/system/config", {"domain-name": "lab"})]
+    with Server() as one, Server() as two:
+        targets = ["127.0.0.1:%d" % s.port for s in (one, two)]
+
+        results = list(rollout(targets, updates=updates, concurrency=2))
+        assert sorted(r.target for r in results) == sorted(targets)
+        assert all(r.error is None for r in results)
+        assert [r.op for r in results[0].response] == ["UPDATE"]
+        assert one.servicer.requests[0] == two.servicer.requests[0]
+
+        # an unreachable canary stops the rollout
+        results = list(rollout(["127.0.0.1:1"] + targets, updates=updates,
+                               waves=[1]))
+        assert results[0].error is not None
+        assert all(isinstance(r.error, RolloutAborted) for r in results[1:])
+        assert len(one.servicer.requests) == 1
+
+        # a target that fails outside of gRPC is reported, not raised
+        results = list(rollout(["127.0.0.1"] + targets, updates=updates))
+        errors = {r.target: r.error for r in results}
+        assert isinstance(errors["127.0.0.1"], ValueError)
+        assert all(errors[t] is None for t in targets)
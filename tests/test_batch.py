@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+from gnmi.batch import SetBatch, coalesce
+from gnmi.messages import Path_
+
+
+def _entries(count):
+    path = "/acl-set[name=edge][type=ACL_IPV4]/acl-entries/acl-entry" \
+        "[sequence-id=%d]/config/description"
+    return [(path % i, "entry-%d" % i) for i in range(count)]
+
+
+def test_chunking():
+    batch = SetBatch(prefix="/acl/acl-sets", max_size=4096)
+    batch.extend(deletes=["/acl-set[name=old][type=ACL_IPV4]"],
+                 updates=_entries(500))
+
+    requests = list(batch.requests())
+
+    assert len(requests) > 1
+    assert all(r.ByteSize() <= 4096 for r in requests)
+    assert len(requests[0].delete) == 1
+    assert sum(len(r.update) for r in requests) == 500
+    assert requests[-1].update[-1].val.string_val == "entry-499"
+
+
+def test_order():
+    batch = SetBatch()
+    batch.update(("/a", 1)).delete("/a").replace(("/b", 2)).update(("/c", 3))
+
+    ops = [(len(r.delete), len(r.replace), len(r.update))
+           for r in batch.requests()]
+
+    # the delete may not jump ahead of the first update
+    assert ops == [(0, 0, 1), (1, 1, 1)]
+
+
+def test_set_batch(local_server, local_session):
+    batch = SetBatch(prefix="/acl/acl-sets", max_size=2048)
+    batch.extend(updates=_entries(100))
+
+    resp = local_session.set_batch(batch)
+
+    assert len(local_server.servicer.requests) > 1
+    assert [r.op for r in resp] == ["UPDATE"] * 100
+    assert len(local_server.servicer.store) == 100
+
+
+def test_coalesce():
+    config = "/interfaces/interface[name=Ethernet%d]/config/%s"
+    updates = [(config % (i, leaf), value) for i in range(3)
+               for leaf, value in (("enabled", True),
+                                   ("description", "uplink"),
+                                   ("name", "Ethernet%d" % i))]
+    updates.append(("/system/config/hostname", "veos3"))
+    updates.append(("/system/config/domain-name", b"lab"))
+    updates.append(("/system/config/login-banner", "hi"))
+    updates.append(("/system/config/mtu", 9000))
+
+    merged = coalesce(updates)
+
+    # one update per list entry, leaves of other entries are not mixed in
+    assert len(merged) == 6
+    assert [Path_(u.path).to_string() for u in merged[:3]] == \
+        ["/interfaces/interface[name=Ethernet%d]/config" % i for i in range(3)]
+    assert json.loads(merged[0].val.json_ietf_val) == \
+        {"enabled": True, "description": "uplink", "name": "Ethernet0"}
+    assert json.loads(merged[3].val.json_ietf_val) == \
+        {"hostname": "veos3", "login-banner": "hi"}
+    # bytes and numbers stay as they are
+    assert merged[4].val.bytes_val == b"lab"
+    assert merged[5].val.int_val == 9000
+
+    request = next(SetBatch().extend(updates=updates).requests())
+    assert sum(u.ByteSize() for u in merged) < \
+        sum(u.ByteSize() for u in request.update)
+
+
+def test_coalesce_order():
+    config = "/interfaces/interface[name=Ethernet1]/config"
+    updates = [(config + "/description", "a"),
+               (config + "/enabled", True),
+               (config, {"description": "b"}, "json_ietf_val"),
+               (config + "/description", "c"),
+               (config + "/name", "Ethernet1"),
+               ("/system/config/hostname", "veos3"),
+               ("/system/config/hostname", b"raw"),
+               ("/system/config/login-banner", "hi"),
+               ("/system/config/hostname", "veos4"),
+               ("/system/config/domain-name", "lab")]
+
+    merged = coalesce(updates)
+    assert merged.pop(4).val.bytes_val == b"raw"
+
+    # leaves after the container update stay after it, so "c" wins
+    assert [json.loads(u.val.json_ietf_val) for u in merged] == [
+        {"description": "a", "enabled": True},
+        {"description": "b"},
+        {"description": "c", "name": "Ethernet1"},
+        # a later hostname does not pass the bytes update of the same leaf
+        {"hostname": "veos3", "login-banner": "hi"},
+        {"hostname": "veos4", "domain-name": "lab"}]
+
+
+def test_coalesce_auto():
+    # JSON escapes non-ASCII characters to six bytes each
+    updates = [("/a/b%d" % i, "\u00e9" * 20) for i in range(2)]
+    assert len(coalesce(updates, "auto")) == 2
+    assert len(coalesce(updates)) == 1
+
+    with pytest.raises(ValueError):
+        coalesce(updates, "proto")
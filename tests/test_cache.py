@@ -0,0 +1,101 @@
+import time
+
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.cache import GetCache
+from gnmi.session import Session
+
+HOSTNAME = "/system/config/hostname"
+MTU = "/interfaces/interface[name=Ethernet1]/config/mtu"
+
+
+def test_lru():
+    cache = GetCache(ttl=0.05, maxsize=2)
+    cache.put(("t", "/a", 0, 0), 1)
+    cache.put(("t", "/b", 0, 0), 2)
+    assert cache.get(("t", "/a", 0, 0)) == 1
+    cache.put(("t", "/c", 0, 0), 3)
+
+    # /b was least recently used
+    assert cache.get(("t", "/b", 0, 0)) is None
+    assert len(cache) == 2
+
+    cache.invalidate("t", "/")
+    assert len(cache) == 0
+
+    cache.put(("t", "/a", 0, 0), 1)
+    time.sleep(0.06)
+    assert cache.get(("t", "/a", 0, 0)) is None
+
+
+def test_session_cache(local_server):
+    servicer = local_server.servicer
+    servicer.store[HOSTNAME] = pb.TypedValue(string_val="veos3")
+    servicer.store[MTU] = pb.TypedValue(int_val=1500)
+
+    sess = Session(local_server.target, cache=GetCache(ttl=60))
+
+    assert sess.get([HOSTNAME, MTU]).collect()[0][0].value == "veos3"
+    resp = sess.get([HOSTNAME, MTU])
+    assert [n[0].value for n in resp.collect()] == ["veos3", 1500]
+    # differing type is a different entry
+    sess.get([MTU], {"type": "config"})
+    assert len(servicer.requests) == 2
+
+    sess.set(updates=[("/system/config", {"hostname": "veos4"})])
+    sess.get([HOSTNAME, MTU])
+
+    # only the overlapping hostname entry was refreshed
+    assert list(servicer.requests[-1].path) == [servicer.requests[0].path[0]]
+    assert sess.cache.hits == 3
+
+
+def test_session_cache_prepared(local_server, monkeypatch):
+    servicer = local_server.servicer
+    servicer.store[HOSTNAME] = pb.TypedValue(string_val="veos3")
+    servicer.store[MTU] = pb.TypedValue(int_val=1500)
+
+    sess = Session(local_server.target, cache=GetCache(ttl=60))
+    prepared = sess.prepare_get([HOSTNAME, MTU], serialize=True)
+
+    sent = []
+    send_get = sess._send_get
+    monkeypatch.setattr(sess, "_send_get",
+                        lambda requests: sent.append(requests) or
+                        send_get(requests))
+
+    resp = sess.get(prepared)
+    assert [n[0].value for n in resp.collect()] == ["veos3", 1500]
+    # nothing cached yet, the serialized requests are sent as they are
+    assert sent == [prepared.requests]
+
+    sess.get(prepared)
+    assert len(sent) == 1
+
+
+def test_invalidate_origin():
+    cache = GetCache()
+    cache.put(("t", "/Sysdb/a", 0, 0), 1)
+    cache.put(("t", "eos_native:/Sysdb/a", 0, 0), 2)
+    cache.put(("t", "eos_native:/Kernel", 0, 0), 3)
+
+    cache.invalidate("t", "eos_native:/Sysdb")
+    assert cache.get(("t", "/Sysdb/a", 0, 0)) == 1
+    assert cache.get(("t", "eos_native:/Sysdb/a", 0, 0)) is None
+
+    # the root of an origin only drops that origin
+    cache.invalidate("t", "eos_native:")
+    assert cache.get(("t", "eos_native:/Kernel", 0, 0)) is None
+    assert len(cache) == 1
+
+
+def test_session_cache_ttl(local_server):
+    servicer = local_server.servicer
+    servicer.store[HOSTNAME] = pb.TypedValue(string_val="veos3")
+
+    sess = Session(local_server.target, cache=GetCache(ttl=60))
+    sess.get([HOSTNAME], {"ttl": 0.01})
+    time.sleep(0.02)
+    sess.get([HOSTNAME], {"ttl": 0.01})
+    sess.get([HOSTNAME])
+    assert len(servicer.requests) == 2
+    assert sess.cache.hits == 1
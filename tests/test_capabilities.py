@@ -0,0 +1,64 @@
+import time
+
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.capabilities import CapabilitiesCache, version_key
+from gnmi.session import Session
+
+
+def _response(version="0.7.0", bgp="6.0.0"):
+    return pb.CapabilityResponse(
+        supported_models=[
+            pb.ModelData(name="openconfig-bgp", version=bgp),
+            pb.ModelData(name="arista-intf-augments", version="")],
+        supported_encodings=[pb.JSON, pb.JSON_IETF],
+        gNMI_version=version)
+
+
+def test_version_key():
+    assert version_key("2.10.0") > version_key("2.9.1")
+    assert version_key("1.0") < version_key("1.0.1")
+
+
+def test_supporting(tmpdir):
+    file = str(tmpdir.join("caps.json"))
+    caps = CapabilitiesCache(file)
+    caps.put("a:6030", _response(bgp="6.0.0"))
+    caps.put("b:6030", _response(bgp="5.2.1"))
+
+    # persisted across instances
+    caps = CapabilitiesCache(file)
+    assert caps.targets == ["a:6030", "b:6030"]
+    assert caps.get("a:6030").gnmi_version == "0.7.0"
+
+    assert caps.supporting("openconfig-bgp") == ["a:6030", "b:6030"]
+    assert caps.supporting("openconfig-bgp", "6.0") == ["a:6030"]
+    assert caps.supporting("openconfig-bgp", encoding="proto") == []
+    assert caps.supporting("arista-intf-augments") == ["a:6030", "b:6030"]
+    assert caps.supporting("arista-intf-augments", "1.0") == []
+
+
+def test_invalidation(tmpdir):
+    caps = CapabilitiesCache(str(tmpdir.join("caps.json")), ttl=0.05)
+
+    assert not caps.put("a:6030", _response())
+    assert caps.get("a:6030", version="0.8.0") is None
+    assert caps.put("a:6030", _response(version="0.8.0"))
+    assert caps.get("a:6030", version="0.8.0") is not None
+
+    time.sleep(0.06)
+    assert caps.get("a:6030") is None
+    assert "a:6030" not in caps
+
+
+def test_session_capabilities(tmpdir, local_server):
+    caps = CapabilitiesCache(str(tmpdir.join("caps.json")))
+    requests = local_server.servicer.requests
+
+    sess = Session(local_server.target, capabilities_cache=caps)
+    assert sess.capabilities().gnmi_version == "0.7.0"
+    assert sess.capabilities().gnmi_version == "0.7.0"
+    assert len(requests) == 1
+
+    sess.capabilities(refresh=True)
+    assert len(requests) == 2
+    assert caps.supporting("openconfig-interfaces", "2.0") == [sess.hostaddr]
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.compaction import Compactor
+from gnmi.messages import Path_, SubscribeResponse_, Update_
+from gnmi.recorder import Recorder
+from gnmi.state import StateCache
+
+
+def _response(path, value=None, delete=False):
+    notif = pb.Notification(prefix=Path_.from_string("/system").raw)
+    if delete:
+        notif.delete.append(Path_.from_string(path).raw)
+    else:
+        notif.update.append(Update_.from_keyval((path, value)).raw)
+    return SubscribeResponse_(pb.SubscribeResponse(update=notif))
+
+
+def test_state_cache():
+    state = StateCache()
+    state.apply(_response("/config/hostname", "veos3"), target="t1")
+    state.apply(_response("/config/domain-name", "lab"), target="t1")
+    state.apply(_response("/config/hostname", "veos4"), target="t2")
+
+    assert state.get("/system/config/hostname", target="t1") == "veos3"
+    assert state.get("/system/config/hostname", target="t2") == "veos4"
+    assert len(state) == 3
+
+    state.apply(_response("/config", delete=True), target="t1")
+    assert state.get("/system/config/hostname", target="t1") is None
+    assert len(state) == 1
+
+
+def test_keyframes(tmp_path):
+    directory = str(tmp_path)
+    with Recorder(directory, target="veos3", segment_size=512,
+                  block_size=256) as rec:
+        for i in range(100):
+            rec.write(_response("/config/hostname", "host%d" % i),
+                      timestamp=i)
+
+    compactor = Compactor(directory, interval=10)
+    written = compactor.build()
+
+    assert [t for t, _ in compactor.keyframes] == list(range(10, 100, 10))
+    assert len(written) == 9
+    # nothing new was recorded
+    assert compactor.build() == []
+
+    state = compactor.state_at(55)
+    assert state.get("/system/config/hostname", target="veos3") == "host54"
+    assert compactor.state_at(5).get("/system/config/hostname",
+                                     target="veos3") == "host4"
+
+    removed = compactor.fold(55)
+    assert [t for t, _ in compactor.keyframes] == list(range(50, 100, 10))
+    assert any(f.endswith(".seg") for f in removed)
+    assert all(os.path.exists(f) is False for f in removed)
+
+    state = compactor.state_at(77)
+    assert state.get("/system/config/hostname", target="veos3") == "host76"
+
+    with pytest.raises(ValueError):
+        compactor.state_at(5)
+
+
+def test_fold_index(tmp_path):
+    # the same recording folded with and without its segment indexes
+    results = []
+    for indexed in (True, False):
+        directory = str(tmp_path / str(indexed))
+        with Recorder(directory, target="veos3", segment_size=512,
+                      block_size=256, index=indexed) as rec:
+            for i in range(100):
+                rec.write(_response("/config/hostname", "host%d" % i),
+                          timestamp=i)
+
+        compactor = Compactor(directory, interval=10)
+        compactor.build()
+        removed = compactor.fold(55)
+        state = compactor.state_at(77)
+        assert state.get("/system/config/hostname",
+                         target="veos3") == "host76"
+        results.append((sorted(os.path.basename(f) for f in removed
+                               if f.endswith(".seg")),
+                        sorted(os.listdir(directory))))
+
+    # segments are folded the same way from the index as by scanning
+    assert results[0][0] == results[1][0]
+    assert results[0][0]
+    assert any(n.endswith(".idx") for n in results[0][1])
+    assert [n for n in results[0][1] if not n.endswith(".idx")] == \
+        results[1][1]
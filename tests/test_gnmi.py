@@ -1,6 +1,7 @@
 import os
 import pytest
 from tests.conftest import GNMI_PASS, GNMI_TARGET, GNMI_SECURE, GNMI_USER
+from gnmi.proto import gnmi_pb2 as pb
 from gnmi.session import Session
 from gnmi.messages import Path_, Update_
 from gnmi.exceptions import GrpcError, GrpcDeadlineExceeded
@@ -97,4 +98,212 @@ def test_set(session):
     # deletes = [
 
     # ]
-    # rsps = session.set(deletes=updates)
\ No newline at end of file
+    # rsps = session.set(deletes=updates)
+
+def test_get_sharded(local_server, local_session):
+    store = local_server.servicer.store
+    paths = []
+    for i in range(10):
+        path = "/interfaces/interface[name=Ethernet%d]/config/mtu" % i
+        store[path] = pb.TypedValue(int_val=1500 + i)
+        paths.append(path)
+    paths.reverse()
+
+    resp = local_session.get(paths, options={"shard_size": 3})
+
+    assert len(local_server.servicer.requests) == 4
+    assert [n[0].value for n in resp.collect()] == \
+        [1500 + i for i in reversed(range(10))]
+
+
+def test_set_coalesce(local_server, local_session):
+    updates = [("/system/config/hostname", "veos3"),
+               ("/system/config/domain-name", "lab")]
+
+    local_session.set(updates=updates, options={"coalesce": "json_ietf"})
+
+    request = local_server.servicer.requests[-1]
+    assert len(request.update) == 1
+    assert Path_(request.update[0].path).to_string() == "/system/config"
+
+
+def test_get_use_models(local_server, local_session):
+    servicer = local_server.servicer
+    servicer.models = {"interfaces": "openconfig-interfaces",
+                       "Sysdb": "arista-sysdb"}
+    servicer.store["/interfaces/interface[name=Ethernet1]/config/mtu"] = \
+        pb.TypedValue(int_val=1500)
+    servicer.store["/Sysdb/interface/config/Ethernet1/mtu"] = \
+        pb.TypedValue(int_val=1500)
+
+    assert len(local_session.get(["/"]).raw.notification[0].update) == 2
+
+    caps = local_session.capabilities()
+    models = [m for m in caps.supported_models
+              if m["name"].startswith("openconfig-")]
+    for use_models in (["openconfig-interfaces"], models):
+        resp = local_session.get(["/"], {"use_models": use_models})
+        request = servicer.requests[-1]
+        assert [m.name for m in request.use_models] == \
+            ["openconfig-interfaces"]
+        assert [str(u.path) for n in resp for u in n] == \
+            ["/interfaces/interface[name=Ethernet1]/config/mtu"]
+
+
+def test_prepared(local_server, local_session):
+    servicer = local_server.servicer
+    paths = []
+    for i in range(4):
+        path = "/interfaces/interface[name=Ethernet%d]/config/mtu" % i
+        servicer.store[path] = pb.TypedValue(int_val=1500 + i)
+        paths.append(path)
+
+    expected = local_session.get(paths, {"shard_size": 2}).raw
+    for serialize in (False, True):
+        prepared = local_session.prepare_get(paths, {"shard_size": 2},
+                                             serialize=serialize)
+        assert len(prepared.requests) == 2
+        assert local_session.get(prepared).raw == expected
+        assert local_session.get(prepared).raw == expected
+
+    for serialize in (False, True):
+        prepared = local_session.prepare_subscribe(
+            paths[:1], {"mode": "once"}, serialize=serialize)
+        responses = list(local_session.subscribe(prepared))
+        assert [u.value for r in responses for u in r.update] == [1500]
+
+
+def test_auto_encoding(local_server):
+    servicer = local_server.servicer
+    servicer.store["/system/config/hostname"] = pb.TypedValue(string_val="a")
+    Session._encodings.clear()
+
+    sess = Session(local_server.target)
+    sess.get(["/system"], {"encoding": "auto"})
+    sess.get(["/system"], {"encoding": "auto"})
+    assert [type(r).__name__ for r in servicer.requests] == \
+        ["CapabilityRequest", "GetRequest", "GetRequest"]
+    assert servicer.requests[-1].encoding == pb.JSON_IETF
+
+    # a fresh Capabilities response updates the pick
+    servicer.encodings = [pb.JSON, pb.PROTO]
+    sess.capabilities()
+    sess.get(["/system"], {"encoding": "auto"})
+    assert servicer.requests[-1].encoding == pb.PROTO
+
+
+def test_subscription_options(local_server, local_session):
+    paths = [
+        ("/interfaces/interface/state/counters",
+         {"submode": "sample", "interval": 10 * 10**9, "heartbeat": 0}),
+        "/interfaces/interface/config",
+    ]
+    prepared = local_session.prepare_subscribe(
+        paths, {"submode": "on-change", "heartbeat": 60 * 10**9})
+
+    subs = prepared.request.subscribe.subscription
+    assert [(s.mode, s.sample_interval, s.heartbeat_interval) for s in subs] \
+        == [(pb.SAMPLE, 10 * 10**9, 0), (pb.ON_CHANGE, 0, 60 * 10**9)]
+
+
+def test_subscribe_streams(local_server, local_session):
+    servicer = local_server.servicer
+    paths = []
+    for i in range(9):
+        path = "/interfaces/interface[name=Ethernet%d]/state/counters" % i
+        servicer.store[path + "/in-octets"] = pb.TypedValue(uint_val=i)
+        paths.append((path, {"rate": 100.0 if i == 0 else 1.0}))
+
+    responses = list(local_session.subscribe(
+        paths, {"mode": "once", "streams": 3}))
+
+    assert sorted(u.value for r in responses for u in r.update) == \
+        list(range(9))
+    assert len(servicer.requests) == 3
+    # the busiest path gets a stream of its own
+    shards = sorted(len(r.subscribe.subscription) for r in servicer.requests)
+    assert shards == [1, 4, 4]
+
+
+def test_get_stream(local_server, local_session):
+    store = local_server.servicer.store
+    for i in range(5):
+        path = "/interfaces/interface[name=Ethernet%d]/config/mtu" % i
+        store[path] = pb.TypedValue(int_val=1500 + i)
+
+    notifs = list(local_session.get_stream(["/interfaces"]))
+
+    assert len(notifs) == 5
+    assert [n.collect()[0].value for n in notifs] == list(range(1500, 1505))
+    req = local_server.servicer.requests[0]
+    assert req.subscribe.mode == pb.SubscriptionList.ONCE
+
+
+def test_get_adaptive(local_server, local_session):
+    servicer = local_server.servicer
+    for i in range(4):
+        for leaf in ("mtu", "description", "enabled"):
+            path = "/interfaces/interface[name=Ethernet%d]/config/%s" % (i, leaf)
+            servicer.store[path] = pb.TypedValue(string_val=leaf)
+    servicer.max_updates = 3
+
+    with pytest.raises(GrpcError):
+        local_session.get(["/interfaces"])
+
+    resp = local_session.get(["/interfaces"], {"adaptive": True})
+    assert sum(len(n.raw.update) for n in resp) == 12
+
+    # the split is remembered, no more failing attempts or discovery
+    del servicer.requests[:]
+    resp = local_session.get(["/interfaces"], {"adaptive": True})
+    assert sum(len(n.raw.update) for n in resp) == 12
+    assert len(servicer.requests) == 4
+    assert all(type(r).__name__ == "GetRequest" for r in servicer.requests)
+
+
+def test_get_adaptive_list(local_server, local_session):
+    servicer = local_server.servicer
+    for i in range(4):
+        for leaf in ("mtu", "description", "enabled"):
+            path = "/interfaces/interface[name=Ethernet%d]/config/%s" % (i, leaf)
+            servicer.store[path] = pb.TypedValue(string_val=leaf)
+    servicer.max_updates = 3
+
+    # every entry of the unkeyed list has a "config" child
+    resp = local_session.get(["/interfaces/interface"], {"adaptive": True})
+    assert sum(len(n.raw.update) for n in resp) == 12
+
+    del servicer.requests[:]
+    resp = local_session.get(["/interfaces/interface"], {"adaptive": True})
+    assert sum(len(n.raw.update) for n in resp) == 12
+    assert len(servicer.requests) == 4
+
+    resp = local_session.get(["/interfaces/interface"],
+                             {"adaptive": True, "type": "config"})
+    assert sum(len(n.raw.update) for n in resp) == 12
+
+
+def test_get_adaptive_prefix(local_server, local_session):
+    servicer = local_server.servicer
+    for i in range(4):
+        for leaf in ("mtu", "description", "enabled"):
+            path = "/interfaces/interface[name=Ethernet%d]/config/%s" % (i, leaf)
+            servicer.store[path] = pb.TypedValue(string_val=leaf)
+    servicer.max_updates = 3
+
+    resp = local_session.get(["/interface"],
+                             {"adaptive": True, "prefix": "/interfaces"})
+    assert sum(len(n.raw.update) for n in resp) == 12
+
+    # the split discovered under one prefix is reused under another
+    del servicer.requests[:]
+    resp = local_session.get(["/interfaces/interface"], {"adaptive": True})
+    assert sum(len(n.raw.update) for n in resp) == 12
+    assert len(servicer.requests) == 4
+    assert all(len(r.prefix.elem) == 0 for r in servicer.requests)
+
+    del servicer.requests[:]
+    resp = local_session.get(["/"], {"adaptive": True,
+                                     "prefix": "/interfaces/interface"})
+    assert sum(len(n.raw.update) for n in resp) == 12
+    assert len(servicer.requests) == 4
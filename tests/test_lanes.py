@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.lanes import PrioritySubscription
+
+COUNTERS = "/interfaces/interface[name=Ethernet%d]/state/counters/in-octets"
+STATUS = "/interfaces/interface[name=Ethernet%d]/state/oper-status"
+
+
+def _store(servicer):
+    for i in range(20):
+        servicer.store[COUNTERS % i] = pb.TypedValue(uint_val=i)
+        servicer.store[STATUS % i] = pb.TypedValue(string_val="UP")
+
+
+def _lane(resp):
+    path = resp.raw.update.update[0].path
+    return 0 if path.elem[-1].name == "oper-status" else 1
+
+
+def test_strict(local_server, local_session):
+    _store(local_server.servicer)
+    sub = PrioritySubscription(local_session, [
+        (COUNTERS % i, {"priority": 1, "submode": "sample",
+                        "interval": 20 * 10**6}) for i in range(20)
+    ] + [(STATUS % i, {"priority": 0}) for i in range(20)])
+
+    lanes = []
+    for resp in sub:
+        if not lanes:
+            # let counters pile up behind a slow consumer
+            time.sleep(0.2)
+        lanes.append(_lane(resp))
+        if len(lanes) == 40:
+            break
+
+    assert lanes[1:21].count(0) >= 19
+    assert sub.delivered[1] > 0
+
+
+def test_weighted(local_server, local_session):
+    _store(local_server.servicer)
+    sample = {"submode": "sample", "interval": 20 * 10**6}
+    sub = PrioritySubscription(local_session, [
+        (STATUS % i, dict(sample, priority=0)) for i in range(20)
+    ] + [
+        (COUNTERS % i, dict(sample, priority=1)) for i in range(20)
+    ], scheduling="weighted", weights={0: 1, 1: 3})
+
+    lanes = []
+    for resp in sub:
+        if not lanes:
+            time.sleep(0.2)
+        lanes.append(_lane(resp))
+        if len(lanes) == 17:
+            break
+
+    # once both lanes are full every fourth response is from priority 0
+    zeros = [i for i, lane in enumerate(lanes) if i and lane == 0]
+    assert len(zeros) >= 3
+    assert all(b - a == 4 for a, b in zip(zeros, zeros[1:]))
+
+    with pytest.raises(ValueError):
+        PrioritySubscription(local_session, [], scheduling="fair")
@@ -1,5 +1,9 @@
+import decimal
 
-from gnmi.messages import Path_, Update_
+import pytest
+
+from gnmi.messages import Path_, Update_, encode_updates, extract_value_v4
+from gnmi.messages import parse_path, typed_value
 
 def test_gnmi_path():
     paths = [
@@ -19,4 +23,44 @@ def test_gnmi_path():
 def test_gnmi_update():
     upd = Update_.from_keyval(("/path/to/val", "hello"))
 
-    assert isinstance(upd, Update_)
\ No newline at end of file
+    assert isinstance(upd, Update_)
+def test_typed_value():
+    assert typed_value(5, "uint_val").uint_val == 5
+    assert typed_value(b"\x00\x01").bytes_val == b"\x00\x01"
+
+    dec = typed_value(decimal.Decimal("12.345")).decimal_val
+    assert (dec.digits, dec.precision) == (12345, 3)
+
+    leaflist = typed_value(["a", 1, True])
+    assert extract_value_v4(leaflist) == ["a", 1, True]
+
+    with pytest.raises(ValueError):
+        typed_value(-1, "uint_val")
+    with pytest.raises(ValueError):
+        typed_value(object())
+
+def test_encode_updates():
+    items = [
+        ("/interfaces/interface[name=Ethernet1]/config/mtu", 9000, "uint_val"),
+        ("/interfaces/interface[name=Ethernet1]/config/description", "up"),
+        ("/interfaces/interface[name=Ethernet1]/config/enabled", True),
+        ("/system/config/hostname", "veos3"),
+    ]
+    cache: dict = {}
+    updates = encode_updates(items, cache)
+
+    for item, update in zip(items, updates):
+        expected = Update_.from_keyval(item).raw
+        assert update == expected
+    # leaves of one container share the parsed parent
+    assert "/interfaces/interface[name=Ethernet1]/config" in cache
+
+
+def test_parse_path():
+    path = parse_path("/interfaces/interface[name=Ethernet1]")
+    assert [e.name for e in path.elem] == ["interfaces", "interface"]
+    assert parse_path(["interfaces", "interface[name=Ethernet1]"]) == path
+    assert parse_path(Path_(path)) is path
+    assert parse_path(None) == parse_path("")
+    with pytest.raises(ValueError):
+        parse_path(1)
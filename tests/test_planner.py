@@ -0,0 +1,80 @@
+from gnmi.planner import Pruned, covers, minimize, path_elems
+from gnmi.planner import balance, split_entry
+
+SPECIFIC = "/interfaces/interface[name=Ethernet1]/state"
+WILDCARD = "/interfaces/interface[name=*]/state"
+
+
+def test_split_entry():
+    assert split_entry(SPECIFIC) == (SPECIFIC, {})
+    assert split_entry((SPECIFIC, {"submode": "sample"})) == \
+        (SPECIFIC, {"submode": "sample"})
+    # a list of path elements is a path
+    assert split_entry(("interfaces", "interface")) == \
+        (("interfaces", "interface"), {})
+
+
+def test_balance():
+    fast = ("/interfaces", {"submode": "sample", "interval": 10**8})
+    slow = ("/lldp", {"submode": "sample", "interval": 10**9})
+    shards = balance(["/system", slow, fast, "/qos"], 2)
+    # the fast sample gets a stream of its own
+    assert shards == [[fast], [slow, "/system", "/qos"]]
+    assert balance(["/system"], 4) == [["/system"]]
+
+
+def test_covers():
+    def check(path, other):
+        return covers(path_elems(path)[1], path_elems(other)[1])
+
+    assert check("/interfaces", SPECIFIC)
+    assert check(WILDCARD, SPECIFIC)
+    assert check("/interfaces/interface/state", SPECIFIC)
+    assert check("/interfaces/.../state", SPECIFIC)
+    assert check("/*/interface", SPECIFIC)
+    assert not check(SPECIFIC, WILDCARD)
+    assert not check(SPECIFIC, "/interfaces/interface/state")
+    assert not check("/interfaces/interface[name=Ethernet2]", SPECIFIC)
+    assert not check("/system", SPECIFIC)
+
+
+def test_minimize():
+    paths = [
+        SPECIFIC,
+        SPECIFIC + "/counters",
+        WILDCARD,
+        "/system/config",
+        "/system/config",
+        # different options are not covered
+        (SPECIFIC + "/counters", {"submode": "sample", "interval": 10**10}),
+    ]
+
+    plan = minimize(paths)
+
+    assert plan.paths == [WILDCARD, "/system/config", paths[-1]]
+    assert plan.pruned == [
+        Pruned(SPECIFIC, WILDCARD),
+        Pruned(SPECIFIC + "/counters", WILDCARD),
+        Pruned("/system/config", "/system/config"),
+    ]
+
+    # options equal to the subscription wide ones are the same
+    plan = minimize(["/system", ("/system/config", {"submode": "sample"})],
+                    {"submode": "sample"})
+    assert plan.paths == ["/system"]
+
+    # paths of another priority are kept for their own lane
+    paths = [WILDCARD, (SPECIFIC, {"priority": 1}),
+             (SPECIFIC + "/counters", {"priority": 0})]
+    plan = minimize(paths)
+    assert plan.paths == paths[:2]
+    assert plan.pruned == [Pruned(paths[2], WILDCARD)]
+
+
+def test_prepare_subscribe(local_session):
+    prepared = local_session.prepare_subscribe(
+        [SPECIFIC, WILDCARD, "/system"], {"minimize": True})
+
+    subs = prepared.request.subscribe.subscription
+    assert len(subs) == 2
+    assert prepared.pruned == (Pruned(SPECIFIC, WILDCARD),)
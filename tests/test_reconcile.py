@@ -0,0 +1,51 @@
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.reconcile import Reconciler
+
+
+def _load(servicer, leaves):
+    for path, value in leaves.items():
+        servicer.store[path] = pb.TypedValue(string_val=value)
+
+
+def test_reconcile(local_server, local_session):
+    servicer = local_server.servicer
+    _load(servicer, {
+        "/system/config/hostname": "veos3",
+        "/system/config/domain-name": "lab",
+        "/system/config/login-banner": "hello",
+        "/system/config/motd/text": "hi",
+        "/system/config/motd/author": "me",
+    })
+
+    rec = Reconciler(local_session, "/system/config", options={})
+    desired = {"hostname": "veos3", "domain-name": "prod",
+               "motd": {"text": "hi"}}
+
+    plan = rec.reconcile(desired, dry_run=True)
+
+    assert plan.updates == [("/system/config/domain-name", "prod")]
+    assert sorted(plan.deletes) == ["/system/config/login-banner",
+                                    "/system/config/motd/author"]
+    assert plan.response is None
+    assert not servicer.requests[1:]
+
+    plan = rec.reconcile(desired)
+
+    assert len(list(plan.response)) == 3
+    assert servicer.store["/system/config/domain-name"].string_val == "prod"
+    assert "/system/config/login-banner" not in servicer.store
+    assert not rec.plan(desired)
+
+
+def test_reconcile_collapse(local_server, local_session):
+    _load(local_server.servicer, {
+        "/system/config/hostname": "veos3",
+        "/system/config/motd/text": "hi",
+        "/system/config/motd/author": "me",
+    })
+
+    rec = Reconciler(local_session, "/system/config", options={})
+    plan = rec.plan([("/hostname", "veos3")])
+
+    assert plan.deletes == ["/system/config/motd"]
+    assert plan.updates == []
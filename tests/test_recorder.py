@@ -0,0 +1,96 @@
+import pytest
+
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.messages import Path_, SubscribeResponse_, Update_
+from gnmi.recorder import Reader, Recorder, zstandard
+
+
+def _response(hostname):
+    update = Update_.from_keyval(("/system/config/hostname", hostname))
+    notif = pb.Notification(timestamp=1, prefix=Path_.from_string("/").raw,
+                            update=[update.raw])
+    return SubscribeResponse_(pb.SubscribeResponse(update=notif))
+
+
+def test_record_and_read(tmp_path):
+    with Recorder(str(tmp_path), target="veos3:6030") as rec:
+        for i in range(10):
+            rec.write(_response("host%d" % i), timestamp=i)
+
+    records = list(Reader(str(tmp_path)))
+
+    assert [r.timestamp for r in records] == list(range(10))
+    assert records[0].target == "veos3:6030"
+    assert records[3].response.update.collect()[0].value == "host3"
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "zstd"])
+def test_compression(tmp_path, compression):
+    if compression == "zstd" and zstandard is None:
+        pytest.skip("zstandard is not installed")
+
+    with Recorder(str(tmp_path), compression=compression,
+                  block_size=1024) as rec:
+        for i in range(100):
+            rec.write(_response("host%d" % (i % 3)), timestamp=i)
+
+    reader = Reader(str(tmp_path))
+    blocks = list(reader.blocks(reader.segments[0]))
+
+    assert len(blocks) > 1
+    if compression:
+        assert sum(b[2] for b in blocks) < sum(b[3] for b in blocks)
+    assert [r.timestamp for r in reader] == list(range(100))
+
+
+def test_segment_rotation(tmp_path):
+    with Recorder(str(tmp_path), segment_size=256, block_size=128) as rec:
+        for i in range(50):
+            rec.write(_response("host%d" % i), target="t%d" % (i % 2))
+
+    # a new recorder never appends to existing segments
+    with Recorder(str(tmp_path)) as rec:
+        rec.write(_response("last"))
+
+    reader = Reader(str(tmp_path))
+    records = list(reader)
+
+    assert len(reader.segments) > 2
+    assert len(records) == 51
+    assert records[-1].response.update.collect()[0].value == "last"
+
+
+def _counter(intf, value):
+    prefix = Path_.from_string("/interfaces/interface[name=%s]" % intf)
+    update = Update_.from_keyval(("/state/counters/in-octets", value))
+    notif = pb.Notification(prefix=prefix.raw, update=[update.raw])
+    return SubscribeResponse_(pb.SubscribeResponse(update=notif))
+
+
+def test_query(tmp_path):
+    with Recorder(str(tmp_path), block_size=512, segment_size=4096) as rec:
+        for i in range(200):
+            rec.write(_counter("Ethernet%d" % (i % 4), i), timestamp=i)
+
+    reader = Reader(str(tmp_path))
+
+    records = list(reader.query("/interfaces/interface[name=Ethernet1]",
+                                start=50, end=100))
+    assert [r.timestamp for r in records] == list(range(53, 100, 4))
+
+    assert len(list(reader.query(start=190))) == 10
+    assert len(list(reader.query("/interfaces/interface"))) == 200
+    assert list(reader.query("/interfaces/interface[name=Ethernet10]")) == []
+
+
+def test_query_unindexed(tmp_path):
+    rec = Recorder(str(tmp_path), block_size=512)
+    for i in range(20):
+        rec.write(_counter("Ethernet%d" % (i % 2), i), timestamp=i)
+    # the open block is not indexed yet, it must still be found
+    rec.flush()
+
+    records = list(Reader(str(tmp_path)).query(
+        "/interfaces/interface[name=Ethernet0]", start=10))
+    assert [r.timestamp for r in records] == [10, 12, 14, 16, 18]
+    rec.close()
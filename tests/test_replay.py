@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.exceptions import GrpcDeadlineExceeded
+from gnmi.messages import Path_, SubscribeResponse_, Update_
+from gnmi.recorder import Recorder
+from gnmi.replay import ReplaySession
+
+MS = 1000000
+
+
+@pytest.fixture()
+def recording(tmp_path):
+    with Recorder(str(tmp_path), target="veos3:6030") as rec:
+        for i in range(20):
+            prefix = Path_.from_string("/interfaces/interface[name=Ethernet%d]"
+                                       % (i % 2))
+            update = Update_.from_keyval(("/state/counters/in-octets", i))
+            notif = pb.Notification(prefix=prefix.raw, update=[update.raw])
+            rec.write(pb.SubscribeResponse(update=notif), timestamp=i * 10 * MS)
+        rec.write(pb.SubscribeResponse(sync_response=True),
+                  timestamp=200 * MS)
+    return str(tmp_path)
+
+
+def test_replay(recording):
+    sess = ReplaySession(recording, speed=None)
+    responses = list(sess.subscribe(
+        ["/interface[name=Ethernet1]"], options={"prefix": "/interfaces"}))
+
+    assert len(responses) == 10
+    assert all(isinstance(r, SubscribeResponse_) for r in responses)
+    assert responses[-1].update.collect()[0].value == 19
+
+    # relative paths are joined to the prefix by element
+    responses = list(sess.subscribe(
+        ["interface[name=Ethernet1]"], options={"prefix": "/interfaces"}))
+    assert len(responses) == 10
+
+    assert list(ReplaySession(recording, target="other").subscribe()) == []
+
+
+def test_replay_speed(recording):
+    start = time.monotonic()
+    assert len(list(ReplaySession(recording, speed=10).subscribe())) == 20
+    # 190ms of recorded gaps at 10x
+    assert time.monotonic() - start >= 0.019
+
+    with pytest.raises(GrpcDeadlineExceeded):
+        for _ in ReplaySession(recording, speed=1).subscribe(
+                options={"timeout": 0.05}):
+            pass
@@ -0,0 +1,123 @@
+import time
+
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.messages import Path_, Update_
+from gnmi.throttle import Throttle
+
+OCTETS = "/interfaces/interface[name=Ethernet1]/state/counters/in-octets"
+STATUS = "/interfaces/interface[name=Ethernet1]/state/oper-status"
+
+
+def _response(path, value, timestamp):
+    update = Update_.from_keyval((path, value)).raw
+    return pb.SubscribeResponse(update=pb.Notification(timestamp=timestamp,
+                                                       update=[update]))
+
+
+def _values(responses):
+    return [(str(u.path), u.value) for r in responses for u in r.update]
+
+
+def test_latest_wins():
+    responses = [_response(OCTETS, i, i) for i in range(1001)]
+
+    def burst():
+        yield from responses[:-1]
+        time.sleep(0.3)
+        yield responses[-1]
+
+    throttle = Throttle(0.1)
+    values = _values(throttle(burst()))
+
+    # the burst collapses into a few values, the final one is kept
+    assert values[-1] == (OCTETS, 1000)
+    assert len(values) < 10
+    assert throttle.received == 1001
+    assert throttle.dropped == 1001 - len(values)
+
+
+def test_intervals():
+    throttle = Throttle(0.01, {"/interfaces/interface/state/counters": 60.0})
+    assert throttle.interval(OCTETS) == 60.0
+    assert throttle.interval(STATUS) == 0.01
+
+    throttle.add(_response(OCTETS, 1, 1))
+    throttle.add(_response(STATUS, "UP", 1))
+    assert len(_values(throttle.flush())) == 2
+
+    throttle.add(_response(OCTETS, 2, 2))
+    throttle.add(_response(STATUS, "DOWN", 2))
+    time.sleep(0.02)
+    # counters are held back for a minute
+    assert _values(throttle.flush()) == [(STATUS, "DOWN")]
+    assert _values(throttle.flush(force=True)) == [(OCTETS, 2)]
+
+
+def test_delete():
+    throttle = Throttle()
+    throttle.add(_response(OCTETS, 1, 1))
+    throttle.add(pb.SubscribeResponse(update=pb.Notification(
+        timestamp=2, delete=[Path_.from_string(
+            "/interfaces/interface[name=Ethernet1]").raw])))
+
+    responses = list(throttle.flush(force=True))
+    assert _values(responses) == []
+    assert [str(Path_(p)) for p in responses[0].raw.update.delete] == \
+        ["/interfaces/interface[name=Ethernet1]"]
+
+
+def test_close():
+    closed = []
+
+    def endless():
+        try:
+            i = 0
+            while True:
+                yield _response(OCTETS, i, i)
+                i += 1
+                time.sleep(0.001)
+        finally:
+            closed.append(True)
+
+    throttle = Throttle(0.01)
+    it = throttle(endless())
+    next(it)
+    it.close()
+
+    time.sleep(0.05)
+    received = throttle.received
+    time.sleep(0.05)
+    # the reader stopped and closed the subscription
+    assert throttle.received == received
+    assert closed == [True]
+
+
+def _wait_cancelled(servicer, count):
+    deadline = time.monotonic() + 2.0
+    while servicer.cancelled < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return servicer.cancelled
+
+
+def test_close_stream(local_server, local_session):
+    servicer = local_server.servicer
+    servicer.store[STATUS] = pb.TypedValue(string_val="UP")
+    prepared = local_session.prepare_subscribe([STATUS])
+
+    # an idle on-change stream, the reader waits on the target
+    call = local_session.open_stream(prepared)
+    it = Throttle(0.01)(call)
+    assert _values([next(it)]) == [(STATUS, "UP")]
+    it.close()
+    assert _wait_cancelled(servicer, 1) == 1
+
+    # a generator is ended through its cancel callback
+    call = local_session.open_stream(prepared)
+
+    def responses():
+        yield from call
+
+    it = Throttle(0.01)(responses(), cancel=call.cancel)
+    next(it)
+    it.close()
+    assert _wait_cancelled(servicer, 2) == 2
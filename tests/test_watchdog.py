@@ -0,0 +1,74 @@
+import pytest
+
+from gnmi.proto import gnmi_pb2 as pb
+from gnmi.exceptions import SubscriptionStalled
+from gnmi.watchdog import WatchedSubscription, expected_interval
+
+COUNTERS = "/interfaces/interface[name=Ethernet%d]/state/counters/in-octets"
+
+
+def _store(servicer):
+    for i in range(5):
+        servicer.store[COUNTERS % i] = pb.TypedValue(uint_val=i)
+    servicer.store["/system/config/hostname"] = pb.TypedValue(string_val="a")
+
+
+def test_expected_interval(local_session):
+    def expected(paths, options):
+        prepared = local_session.prepare_subscribe(paths, options)
+        return expected_interval(prepared.request)
+
+    sample = {"submode": "sample", "interval": 10**9}
+    assert expected(["/system"], {}) is None
+    assert expected(["/system"], {"heartbeat": 3 * 10**9}) == 3.0
+    assert expected([("/interfaces", sample), "/system"], {}) == 1.0
+    assert expected([("/interfaces", dict(sample, suppress=True))], {}) \
+        is None
+    assert expected([("/interfaces", sample)], {"mode": "once"}) is None
+
+
+def test_restart(local_server, local_session):
+    servicer = local_server.servicer
+    _store(servicer)
+    servicer.stall = 1
+
+    sub = WatchedSubscription(local_session, [
+        ("/interfaces", {"submode": "sample", "interval": 20 * 10**6}),
+        "/system",
+    ], grace=0.05)
+    assert sub.expected == [0.02]
+
+    seen = 0
+    for _ in sub:
+        seen += 1
+        if sub.stalls and seen > 20:
+            break
+        assert seen < 1000
+
+    # re-established once, then the samples keep coming
+    assert len(servicer.requests) == 2
+    assert sub.events[0].stream == 0
+    assert sub.events[0].expected == 0.02
+    assert sub.events[0].idle > 0.07
+
+
+def test_streams(local_session):
+    sub = WatchedSubscription(local_session, [
+        ("/interfaces", {"submode": "sample", "interval": 20 * 10**6}),
+        "/system",
+    ], {"streams": 2})
+    assert sorted(sub.expected, key=str) == [0.02, None]
+
+
+def test_max_restarts(local_server, local_session):
+    _store(local_server.servicer)
+    local_server.servicer.stall = 2
+
+    sub = WatchedSubscription(local_session, [
+        ("/interfaces", {"submode": "sample", "interval": 20 * 10**6})],
+        grace=0.05, max_restarts=1)
+
+    with pytest.raises(SubscriptionStalled):
+        for _ in sub:
+            pass
+    assert sub.stalls == 1